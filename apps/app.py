@@ -1,20 +1,23 @@
 import streamlit as st
 
+from assets import local_asset
 from config import config
-from auth import logout
+from auth import is_admin, logout
+from profiler import profile_rerun
 from pages import (
     login_pages,
     reset_password_pages,
     finance_pages,
     registrations_pages,
     console_pages,
+    admin_pages,
 )
 
 
 if __name__ == "__main__":
     st.set_page_config(
         page_title="Newcastle West Hockey",
-        page_icon=config.app.club_logo,
+        page_icon=local_asset(config.app.club_logo),
         layout="wide",
         initial_sidebar_state="auto",
     )
@@ -26,15 +29,18 @@ if __name__ == "__main__":
     navigation["Finance"] = finance_pages
     if st.session_state.get("authentication_status", False):
         navigation["Reset Password"] = reset_password_pages
+        if is_admin():
+            navigation["Admin"] = admin_pages
         logout()
 
     pg = st.navigation(navigation)
-    st.logo(config.app.club_logo)
+    st.logo(local_asset(config.app.club_logo))
     col1, col2 = st.columns([1, 6], vertical_alignment="center", gap="medium")
-    col1.image(config.app.club_logo, use_column_width=False, width=100)
+    col1.image(local_asset(config.app.club_logo), use_column_width=False, width=100)
     col2.title(
         config.app.club_name + " Hockey Club",
     )
     st.sidebar.text("Maintained by Alastair 🧑🏻‍💻")
 
-    pg.run()
+    with profile_rerun(pg.title):
+        pg.run()
@@ -0,0 +1,181 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+from PIL import Image
+
+ASSET_CACHE_DIR = Path(
+    os.getenv("ASSET_CACHE_DIR", default=Path(__file__).parent / ".asset_cache")
+)
+# Seconds before a cached asset is revalidated against its ETag.
+ASSET_MAX_AGE = int(os.getenv("ASSET_MAX_AGE", default=86400))
+# Streamlit serves the static directory next to app.py at app/static, as
+# server.enableStaticServing is set in .streamlit/config.toml. The downscaled
+# assets are written there, so browsers fetch and cache them like any image.
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL = "app/static"
+RESIZED_DIR = STATIC_DIR / "assets"
+# The format each asset is downscaled to, by its original format, and its extension.
+RESIZED_FORMATS = {"JPEG": "jpg", "PNG": "png"}
+# The pixel size logos are rendered at.
+ASSET_SIZE = 100
+FETCH_TIMEOUT = 5
+# Seconds before an asset that couldn't be fetched is tried again.
+FETCH_RETRY_SECONDS = 300
+
+# One lock per asset, so a slow fetch only holds up the sessions showing that asset.
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_LOCK = threading.Lock()
+# When each asset that couldn't be fetched can be tried again.
+_RETRY_AT: dict[str, float] = {}
+_URLS: dict[tuple[str, int], tuple[float, str]] = {}
+
+
+def local_asset(url: Optional[str], size: int = ASSET_SIZE) -> Optional[str]:
+    """The path to a local copy of the asset, downscaled to fit the size.
+
+    Args:
+        url (str, optional): The url of the asset.
+        size (int, optional): The largest width and height in pixels. Defaults to 100.
+
+    Returns:
+        Optional[str]: The path, or the url if the asset can't be fetched.
+    """
+    if not url:
+        return url
+    path = _resized(url, size)
+    return str(path) if path else url
+
+
+def served_asset(url: Optional[str], size: int = ASSET_SIZE) -> Optional[str]:
+    """The url a local copy of the asset is served at, downscaled to fit the size,
+    for use in html.
+
+    Args:
+        url (str, optional): The url of the asset.
+        size (int, optional): The largest width and height in pixels. Defaults to 100.
+
+    Returns:
+        Optional[str]: The url of the local copy, or the url if the asset can't be fetched.
+    """
+    if not url:
+        return url
+    cached = _URLS.get((url, size))
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    path = _resized(url, size)
+    if not path:
+        return url
+    served_url = f"{ STATIC_URL }/{ path.relative_to(STATIC_DIR).as_posix() }"
+    _URLS[(url, size)] = (time.monotonic() + ASSET_MAX_AGE, served_url)
+    return served_url
+
+
+def _resized(url: str, size: int) -> Optional[Path]:
+    """Fetch or revalidate the asset, then downscale it if it has changed.
+
+    JPEGs stay JPEGs and everything else becomes a PNG. The original is kept if it
+    is smaller than its downscaled copy.
+    """
+    name = hashlib.sha1(url.encode()).hexdigest()
+    original = ASSET_CACHE_DIR / name
+    with _lock(url):
+        changed = _fetch(url, original, ASSET_CACHE_DIR / f"{ name }.json")
+        if not original.exists():
+            return
+        resized = _resized_path(name, size)
+        if changed or resized is None:
+            try:
+                with Image.open(original) as image:
+                    original_format = image.format
+                    resized_format = (
+                        original_format if original_format in RESIZED_FORMATS else "PNG"
+                    )
+                    fits = image.width <= size and image.height <= size
+                    image.thumbnail((size, size))
+                    if resized_format == "JPEG" and image.mode not in ("RGB", "L"):
+                        image = image.convert("RGB")
+                    buffer = io.BytesIO()
+                    image.save(buffer, format=resized_format, optimize=True)
+            except OSError as error:
+                logging.warning(f"Couldn't resize the asset {url}: {error}")
+                return
+            content = buffer.getvalue()
+            if fits and original_format == resized_format:
+                content = min(content, original.read_bytes(), key=len)
+            if resized is not None:
+                resized.unlink(missing_ok=True)
+            extension = RESIZED_FORMATS[resized_format]
+            resized = RESIZED_DIR / f"{ name }_{ size }.{ extension }"
+            _write(resized, content)
+    return resized
+
+
+def _resized_path(name: str, size: int) -> Optional[Path]:
+    """The downscaled copy of the asset, in whichever format it was written."""
+    for extension in RESIZED_FORMATS.values():
+        path = RESIZED_DIR / f"{ name }_{ size }.{ extension }"
+        if path.exists():
+            return path
+    return None
+
+
+def _lock(url: str) -> threading.Lock:
+    with _LOCKS_LOCK:
+        return _LOCKS.setdefault(url, threading.Lock())
+
+
+def _fetch(url: str, path: Path, metadata_path: Path) -> bool:
+    """Download the asset, unless the cached copy is fresh or still matches its ETag.
+
+    Returns: True if a new copy was downloaded.
+    """
+    metadata = {}
+    if path.exists() and metadata_path.exists():
+        metadata = json.loads(metadata_path.read_text())
+        if time.time() - metadata.get("fetched", 0) < ASSET_MAX_AGE:
+            return False
+    if _RETRY_AT.get(url, 0.0) > time.monotonic():
+        return False
+    request = urllib.request.Request(url)
+    if metadata.get("etag"):
+        request.add_header("If-None-Match", metadata["etag"])
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            content = response.read()
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as error:
+        if error.code != 304:
+            logging.warning(f"Couldn't fetch the asset {url}: {error}")
+            _RETRY_AT[url] = time.monotonic() + FETCH_RETRY_SECONDS
+            return False
+        _RETRY_AT.pop(url, None)
+        metadata["fetched"] = time.time()
+        _write(metadata_path, json.dumps(metadata).encode())
+        return False
+    except (urllib.error.URLError, OSError) as error:
+        # Keep serving the cached copy, if there is one.
+        logging.warning(f"Couldn't fetch the asset {url}: {error}")
+        _RETRY_AT[url] = time.monotonic() + FETCH_RETRY_SECONDS
+        return False
+    _RETRY_AT.pop(url, None)
+    _write(path, content)
+    _write(metadata_path, json.dumps({"etag": etag, "fetched": time.time()}).encode())
+    return True
+
+
+def _write(path: Path, content: bytes) -> None:
+    """Write the file atomically, so other processes never read a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(
+        f"{ path.name }.{ os.getpid() }.{ threading.get_ident() }.tmp"
+    )
+    temporary_path.write_bytes(content)
+    os.replace(temporary_path, path)
@@ -1,51 +1,121 @@
 import hashlib
+import os
+import threading
+import time
+from typing import Optional
+import pandas as pd
 import streamlit as st
 import streamlit_authenticator as stauth
 
 from config import config
-from utils import read_data, update_data
+from queries import register_query
+from utils import bulk_update, compare_dataframes, read_data, table_events
 
-
-def auth(roles: list[str]) -> stauth.Authenticate:
-    """Pass the paramaters to the authenicator.
-
-    Args:
-        roles list[str]: List of roles that are allowed access to the application.
-
-    Returns:
-        stauth.Authenticate: The authenicator.
+USERS = register_query(
+    "auth.users",
     """
-    users = read_data(
-        f"""
         select
             id,
             name,
             username,
             email,
+            role,
             hashed_password
         from users
         where
-            role in (
-                '{ "', '".join(roles) }'
-            )
+            role = any(:roles)
+    """,
+    tables=("users",),
+)
+# Seconds the users are kept in memory for, before being reloaded.
+USERS_TTL = int(os.getenv("USERS_TTL", default=600))
+
+
+class CredentialStore:
+    """The authorised users, loaded once per process.
+
+    The users are reloaded when the users table changes, or after USERS_TTL seconds.
+    """
+
+    def __init__(self, roles: list[str], ttl: int = USERS_TTL) -> None:
+        self.roles = roles
+        self.ttl = ttl
+        self._users: Optional[pd.DataFrame] = None
+        self._authenticator: Optional[stauth.Authenticate] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+        table_events.subscribe(self._invalidate)
+
+    @property
+    def authenticator(self) -> stauth.Authenticate:
+        """The authenticator for the users, rebuilt if the users have changed."""
+        table_events.poll()
+        with self._lock:
+            if self._authenticator is None or self._expires < time.monotonic():
+                self._users = read_data(USERS, {"roles": self.roles})
+                self._authenticator = auth(self._users)
+                self._expires = time.monotonic() + self.ttl
+            return self._authenticator
+
+    def role(self, username: str) -> Optional[str]:
+        """The role of the user.
+
+        Args:
+            username (str): The username the user logged in with.
+
+        Returns:
+            Optional[str]: The role, or None if the user isn't authorised.
         """
-    )
+        return self.authenticator.credentials["usernames"].get(username, {}).get("role")
+
+    def save(self, authenticator: stauth.Authenticate) -> None:
+        """Write the users whose login details the authenticator has changed.
+
+        Args:
+            authenticator (stauth.Authenticate): The authenticator used to login.
+        """
+        with self._lock:
+            users = self._users
+        changed = _changed_users(authenticator, users)
+        # Not blocked by the database lock, users need to be able to log in.
+        bulk_update("users", changed, "id", ["username", "hashed_password"])
+
+    def _invalidate(self, *tables: str) -> None:
+        if "users" in tables or "*" in tables:
+            self._expires = 0.0
+
+
+def auth(users: pd.DataFrame) -> stauth.Authenticate:
+    """Pass the paramaters to the authenicator.
+
+    Args:
+        users (pd.DataFrame): The users that are allowed access to the application.
+
+    Returns:
+        stauth.Authenticate: The authenicator.
+    """
+    registered = users[~users["hashed_password"].isna()]
     config = {
         "credentials": {
             "usernames": {
-                row["email"]: {
-                    "id": row["id"],
-                    "email": row["email"],
-                    "name": row["name"],
-                    "password": row["hashed_password"],
+                email: {
+                    "id": id,
+                    "email": email,
+                    "name": name,
+                    "role": role,
+                    "password": password,
                 }
-                for _, row in users[~users["hashed_password"].isna()].iterrows()
+                for id, email, name, role, password in zip(
+                    registered["id"],
+                    registered["email"],
+                    registered["name"],
+                    registered["role"],
+                    registered["hashed_password"],
+                )
             }
         },
         "preauthorized": {
-            "emails": [
-                email for email in users[users["hashed_password"].isna()]["email"]
-            ]
+            "emails": users[users["hashed_password"].isna()]["email"].tolist()
         },
     }
     return stauth.Authenticate(
@@ -57,11 +127,19 @@ def auth(roles: list[str]) -> stauth.Authenticate:
     )
 
 
-AUTHENTICATOR = auth(config.app.user_groups)
+CREDENTIALS = CredentialStore(config.app.user_groups)
 
 
-def login(authenticator: stauth.Authenticate = AUTHENTICATOR):
+def is_admin() -> bool:
+    """True if the user is logged in with the admin role."""
+    if not st.session_state.get("authentication_status", False):
+        return False
+    return CREDENTIALS.role(st.session_state.get("username")) == "admin"
+
+
+def login(authenticator: Optional[stauth.Authenticate] = None):
     """Login into app"""
+    authenticator = authenticator or CREDENTIALS.authenticator
     # initalise session state variables
     st.session_state["authentication_status"] = False
     st.session_state["username"] = None
@@ -72,28 +150,31 @@ def login(authenticator: stauth.Authenticate = AUTHENTICATOR):
         st.error("Username/password is incorrect")
 
 
-def logout(authenicator: stauth.Authenticate = AUTHENTICATOR):
+def logout(authenicator: Optional[stauth.Authenticate] = None):
     """Log out of the app"""
+    authenicator = authenicator or CREDENTIALS.authenticator
     authenicator.logout(button_name="Logout", location="sidebar", key="unique_key")
 
 
-def reset_password(authenticator: stauth.Authenticate = AUTHENTICATOR) -> None:
+def reset_password(authenticator: Optional[stauth.Authenticate] = None) -> None:
     """Resets users password after login
 
     Args:
-        authenticator (stauth.Authenticate): The authenticator used to login.
+        authenticator (stauth.Authenticate, optional): The authenticator used to login.
     """
+    authenticator = authenticator or CREDENTIALS.authenticator
     if authenticator.reset_password(
         form_name="Reset password",
         username=st.session_state["username"],
         location="main",
     ):
         st.success("Password modified successfully")
-        _update_config(authenticator)
+        CREDENTIALS.save(authenticator)
 
 
-def register_user(authenticator: stauth.Authenticate = AUTHENTICATOR) -> None:
+def register_user(authenticator: Optional[stauth.Authenticate] = None) -> None:
     """Register a new user."""
+    authenticator = authenticator or CREDENTIALS.authenticator
     st.write(
         "You can only create a login if you have been added to a pre-approved list of users."
     )
@@ -111,30 +192,36 @@ def register_user(authenticator: stauth.Authenticate = AUTHENTICATOR) -> None:
         # },
     ):
         st.success("User registered successfully")
-        _update_config(authenticator)
+        CREDENTIALS.save(authenticator)
 
 
-def _update_config(authenticator: stauth.Authenticate) -> None:
-    """Update the users login details.
+def _changed_users(
+    authenticator: stauth.Authenticate, users: Optional[pd.DataFrame]
+) -> pd.DataFrame:
+    """The users whose username or password differ from the users table.
 
     Args:
         authenticator (stauth.Authenticate): The authenticator used to login.
+        users (pd.DataFrame, optional): The users as last read from the table.
+
+    Returns:
+        pd.DataFrame: The id, username and hashed_password of each changed user.
     """
     gen_id = lambda x: hashlib.shake_256(x.encode("utf-8")).hexdigest(20)
-    for username, attrs in authenticator.credentials["usernames"].items():
-        if not attrs["password"]:
-            continue
-        update_data(
-            "users",
-            column="hashed_password",
-            value=attrs["password"],
-            row_id=gen_id(attrs["email"]),
-            value_string_type=True,
-        )
-        update_data(
-            "users",
-            column="username",
-            value=username,
-            row_id=gen_id(attrs["email"]),
-            value_string_type=True,
-        )
+    credentials = pd.DataFrame(
+        [
+            {
+                "id": gen_id(attrs["email"]),
+                "username": username,
+                "hashed_password": attrs["password"],
+            }
+            for username, attrs in authenticator.credentials["usernames"].items()
+            if attrs["password"]
+        ],
+        columns=["id", "username", "hashed_password"],
+    )
+    if users is None or not users.shape[0]:
+        return credentials
+    return compare_dataframes(
+        users[["id", "username", "hashed_password"]], credentials, "id"
+    )
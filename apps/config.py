@@ -16,6 +16,7 @@ class Config:
         logo_assets: dict[str, str]
         user_groups: list[str]
         database_lock: bool = True
+        results_page_size: int = 20
 
     @dataclass
     class Xero:
@@ -0,0 +1,48 @@
+import streamlit as st
+
+from auth import is_admin
+from metrics import metrics
+from utils import auth_validation, pool_statistics, query_cache
+
+
+@auth_validation
+def main() -> None:
+    """Show how long each query takes, and the state of the connection pool and cache.
+
+    The metrics are for this process only, since it last started or was reset.
+
+    Retuns: None
+    """
+    if not is_admin():
+        st.error("Only administrators can view the query metrics.")
+        return
+    st.subheader("QUERY LATENCY", divider="green")
+    summary = metrics.summary()
+    if not summary.shape[0]:
+        st.write("No queries have run yet")
+    st.dataframe(
+        summary,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            column: st.column_config.NumberColumn(format="%.1f")
+            for column in ["p50_ms", "p95_ms", "max_ms", "acquire_p95_ms", "mean_rows"]
+        },
+    )
+
+    st.subheader("SLOW QUERIES", divider="green")
+    st.write(f"Calls slower than {metrics.slow_query_seconds:.2f}s, newest first.")
+    st.dataframe(metrics.slow_queries(), hide_index=True, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    col1.subheader("CONNECTION POOL", divider="green")
+    col1.dataframe(pool_statistics(), use_container_width=True)
+    col2.subheader("QUERY CACHE", divider="green")
+    col2.dataframe(query_cache.statistics(), use_container_width=True)
+
+    if st.button("Reset the metrics"):
+        metrics.reset()
+        st.rerun()
+
+
+main()
@@ -1,16 +1,11 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def invoice_data() -> pd.DataFrame:
-    """Extact the outstanding club fees.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+INVOICES = register_query(
+    "finance.invoice_data",
     """
-    return read_data(
-        f"""
         select
             r.season,
             p.full_name,
@@ -39,18 +34,13 @@ def invoice_data() -> pd.DataFrame:
             i.due_date,
             total_amount_due desc,
             issued_date asc
+    """,
+    tables=("invoices", "registrations", "players", "teams"),
+    ttl=300,
+)
+LARGEST_OVER_DUE_DEBITORS = register_query(
+    "finance.largest_over_due_debitors",
     """
-    )
-
-
-def largest_over_due_debitors() -> pd.DataFrame:
-    """Extact the outstanding club fees.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
-    """
-    return read_data(
-        f"""
         with outstanding_invoices as (
             select
                 p.id as player_id,
@@ -85,18 +75,13 @@ def largest_over_due_debitors() -> pd.DataFrame:
             p.full_name
         order by
             total_amount_due desc
+    """,
+    tables=("invoices", "registrations", "players"),
+    ttl=300,
+)
+INVOICE_OVERVIEW = register_query(
+    "finance.invoice_overview_data",
     """
-    )
-
-
-def invoice_overview_data() -> pd.DataFrame:
-    """Extact the outstanding club fees.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
-    """
-    df = read_data(
-        """
         with _invoices as (
             select
                 i.id,
@@ -156,7 +141,7 @@ def invoice_overview_data() -> pd.DataFrame:
                 i.registration_id,
                 case
                     when pp.amount_due <= 0 then 'PAID'
-                    else (pp.amount_paid / (pp.amount_invoiced - (pp.discount + pp.amount_credited)) * 100)::text || '%% PAID'
+                    else (pp.amount_paid / (pp.amount_invoiced - (pp.discount + pp.amount_credited)) * 100)::text || '% PAID'
                 end as status,
                 i.registration_date,
                 i.grade,
@@ -220,8 +205,55 @@ def invoice_overview_data() -> pd.DataFrame:
             due_date,
             registration_date desc,
             amount_due desc
+    """,
+    tables=("invoices", "registrations", "players"),
+    ttl=300,
+)
+COLLECTED_FEES = register_query(
+    "finance.collected_fees_data",
+    """
+            select
+                i.id,
+                i.fully_paid_date,
+                date_trunc('WEEK', i.fully_paid_date) as fully_paid_week,
+                i.amount_paid
+            from invoices as i
+            inner join registrations as r
+            on i.registration_id = r.id
+            where
+                i.status not in ('VOID', 'VOIDED', 'DELETED') and
+                r.season = :season
+        """,
+    tables=("invoices", "registrations"),
+    ttl=300,
+)
+
+
+def invoice_data() -> pd.DataFrame:
+    """Extact the outstanding club fees.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
     """
-    )
+    return read_data(INVOICES)
+
+
+def largest_over_due_debitors() -> pd.DataFrame:
+    """Extact the outstanding club fees.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    return read_data(LARGEST_OVER_DUE_DEBITORS)
+
+
+def invoice_overview_data() -> pd.DataFrame:
+    """Extact the outstanding club fees.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    df = read_data(INVOICE_OVERVIEW)
     df.loc[:, "invoice_description"] = df["lines"].str[0].str["Description"]
     df = df[df["invoice_description"] != "Non paying player"]
     date_cols = ["due_date", "fully_paid_date"]
@@ -240,18 +272,4 @@ def collected_fees_data(season: str) -> pd.DataFrame:
     Args:
         season (str): The season to show the chart for.
     """
-    return read_data(
-        f"""
-            select
-                i.id,
-                i.fully_paid_date,
-                date_trunc('WEEK', i.fully_paid_date) as fully_paid_week,
-                i.amount_paid
-            from invoices as i
-            inner join registrations as r
-            on i.registration_id = r.id
-            where
-                i.status not in ('VOID', 'VOIDED', 'DELETED') and
-                r.season = '{season}'
-        """
-    )
+    return read_data(COLLECTED_FEES, {"season": season})
@@ -0,0 +1,74 @@
+from functools import lru_cache
+from typing import Optional
+
+from config import config
+
+# The keywords identifying each club in team names, matched in this order. The order
+# is the precedence the results pages have always used, e.g. "Uni Tigers" is
+# University and "West Uni" is University.
+CLUB_KEYWORDS = (
+    ("COLT", "Colts"),
+    ("CRUSADER", "Crusaders"),
+    ("GOSFORD", "Gosford"),
+    ("MAITLAND", "Maitland"),
+    ("NORTH", "Norths"),
+    ("PORT", "Port Stephens"),
+    ("UNI", "University"),
+    ("SOUTH", "Souths"),
+    ("TIGER", "Tigers"),
+    ("WEST", "West"),
+    ("4THGREEN", "West"),
+    ("4THRED", "West"),
+)
+
+
+@lru_cache(maxsize=1)
+def club_keywords() -> tuple[tuple[str, str], ...]:
+    """The upper case keywords identifying each club with a logo, in match order.
+
+    Clubs in config.app.logo_assets without keywords in CLUB_KEYWORDS are matched
+    last, by their singular name, e.g. "Tiger" for "Tigers".
+
+    Returns:
+        tuple[tuple[str, str], ...]: The keyword and club name pairs.
+    """
+    keywords = [
+        (keyword, club)
+        for keyword, club in CLUB_KEYWORDS
+        if club in config.app.logo_assets
+    ]
+    known = {club for _, club in CLUB_KEYWORDS}
+    keywords += [
+        (club.upper().rstrip("S"), club)
+        for club in config.app.logo_assets
+        if club not in known
+    ]
+    return tuple(keywords)
+
+
+@lru_cache(maxsize=512)
+def club_name(team_name: str) -> Optional[str]:
+    """Find the club in the team name.
+
+    Args:
+        team_name (str): The raw team name, e.g. "Norths Green".
+
+    Returns:
+        Optional[str]: The club name, None if not a club with a logo.
+    """
+    _team_name = team_name.upper()
+    for keyword, club in club_keywords():
+        if keyword in _team_name:
+            return club
+
+
+def club_logo_url(team_name: str) -> Optional[str]:
+    """Find the logo of the club in the team name.
+
+    Args:
+        team_name (str): The raw team name.
+
+    Returns:
+        Optional[str]: The url to the club logo, None if the club has no logo.
+    """
+    return config.app.logo_assets.get(club_name(team_name))
@@ -0,0 +1,177 @@
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Calls slower than this many seconds are logged, and kept in the slow query log.
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", default=0.5))
+# The most recent calls kept per query, the percentiles are over these.
+MAX_SAMPLES = 1000
+MAX_SLOW_QUERIES = 100
+# Modules whose frames are skipped when finding the model function that made a call.
+_HELPER_MODULES = {__name__, "utils"}
+
+
+@dataclass(slots=True)
+class QueryCall:
+    """One call to the database, or to the query cache."""
+
+    query: str
+    seconds: float
+    rows: int
+    acquire_seconds: float
+    caller: str
+    cached: bool = False
+
+
+@dataclass
+class QueryMetrics:
+    calls: deque = field(default_factory=lambda: deque(maxlen=MAX_SAMPLES))
+    total_calls: int = 0
+    cache_hits: int = 0
+
+
+class MetricsRegistry:
+    """The wall time, rows and connection acquire time of the queries in this process."""
+
+    def __init__(self, slow_query_seconds: float = SLOW_QUERY_SECONDS) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self._queries: dict[str, QueryMetrics] = {}
+        self._slow_queries: deque = deque(maxlen=MAX_SLOW_QUERIES)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        query: str,
+        seconds: float,
+        rows: int,
+        acquire_seconds: float = 0.0,
+        caller: Optional[str] = None,
+        cached: bool = False,
+    ) -> None:
+        """Record a call.
+
+        Args:
+            query (str): The name of the query, or the statement it ran.
+            seconds (float): The wall time of the call.
+            rows (int): The rows returned or affected.
+            acquire_seconds (float, optional): The time waiting for a pooled connection.
+            caller (str, optional): The function that made the call. Defaults to
+                the first function outside of the database helpers.
+            cached (bool, optional): True if the results came from the query cache.
+        """
+        call = QueryCall(
+            query=query,
+            seconds=seconds,
+            rows=rows,
+            acquire_seconds=acquire_seconds,
+            caller=caller or _caller(),
+            cached=cached,
+        )
+        with self._lock:
+            metrics = self._queries.setdefault(query, QueryMetrics())
+            metrics.total_calls += 1
+            if cached:
+                metrics.cache_hits += 1
+                return
+            metrics.calls.append(call)
+            if seconds >= self.slow_query_seconds:
+                self._slow_queries.append(call)
+        if seconds >= self.slow_query_seconds:
+            logging.warning(
+                f"Slow query {query} from {call.caller}: {seconds:.3f}s, "
+                f"{rows} rows, {acquire_seconds:.3f}s acquiring a connection"
+            )
+
+    def summary(self) -> pd.DataFrame:
+        """The percentiles of each query's database calls, slowest first.
+
+        Returns:
+            pd.DataFrame: One row per query.
+        """
+        with self._lock:
+            queries = {
+                query: (list(metrics.calls), metrics.total_calls, metrics.cache_hits)
+                for query, metrics in self._queries.items()
+            }
+        rows = []
+        for query, (calls, total_calls, cache_hits) in queries.items():
+            seconds = np.array([call.seconds for call in calls]) * 1000
+            acquire = np.array([call.acquire_seconds for call in calls]) * 1000
+            rows.append(
+                {
+                    "query": query,
+                    "calls": total_calls,
+                    "cache_hits": cache_hits,
+                    "p50_ms": np.percentile(seconds, 50) if calls else None,
+                    "p95_ms": np.percentile(seconds, 95) if calls else None,
+                    "max_ms": seconds.max() if calls else None,
+                    "acquire_p95_ms": np.percentile(acquire, 95) if calls else None,
+                    "mean_rows": (
+                        np.mean([call.rows for call in calls]) if calls else None
+                    ),
+                    "callers": ", ".join(sorted({call.caller for call in calls})),
+                }
+            )
+        columns = [
+            "query",
+            "calls",
+            "cache_hits",
+            "p50_ms",
+            "p95_ms",
+            "max_ms",
+            "acquire_p95_ms",
+            "mean_rows",
+            "callers",
+        ]
+        return (
+            pd.DataFrame(rows, columns=columns)
+            .sort_values("p95_ms", ascending=False, na_position="last")
+            .reset_index(drop=True)
+        )
+
+    def slow_queries(self) -> pd.DataFrame:
+        """The most recent calls slower than the threshold, newest first.
+
+        Returns:
+            pd.DataFrame: One row per call.
+        """
+        with self._lock:
+            calls = list(self._slow_queries)
+        return pd.DataFrame(
+            [
+                {
+                    "query": call.query,
+                    "caller": call.caller,
+                    "ms": call.seconds * 1000,
+                    "rows": call.rows,
+                    "acquire_ms": call.acquire_seconds * 1000,
+                }
+                for call in reversed(calls)
+            ],
+            columns=["query", "caller", "ms", "rows", "acquire_ms"],
+        )
+
+    def reset(self) -> None:
+        """Forget every recorded call."""
+        with self._lock:
+            self._queries.clear()
+            self._slow_queries.clear()
+
+
+def _caller() -> str:
+    """The first function on the stack outside of the database helpers."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") in _HELPER_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+
+
+metrics = MetricsRegistry()
@@ -8,6 +8,11 @@ console = st.Page(
     title="Invoicing console",
     icon=":material/settings:",
 )
+console_query_metrics = st.Page(
+    page=console_path / "query_metrics.py",
+    title="Query Metrics",
+    icon=":material/monitoring:",
+)
 # Result pages
 results_path = Path("result")
 results_game = st.Page(
@@ -88,6 +93,7 @@ login_reset_password = st.Page(
 
 login_pages: list[st.Page] = [login_page, login_create_login]
 console_pages: list[st.Page] = [console]
+admin_pages: list[st.Page] = [console_query_metrics]
 reset_password_pages: list[st.Page] = [login_reset_password]
 result_pages: list[st.Page] = [results_game, results_team, results_player]
 selections_pages: list[st.Page] = [
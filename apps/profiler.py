@@ -0,0 +1,234 @@
+import datetime as dt
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Iterator, Optional
+
+# Opt in to profiling every rerun of a page, e.g. PROFILE_RERUNS=true streamlit run app.py
+PROFILE_RERUNS = os.getenv("PROFILE_RERUNS", default="false").lower() == "true"
+# Where the traces are written, one per rerun.
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", default="profiles"))
+
+PROFILER_PATH = Path(__file__).resolve()
+APPS_PATH = str(PROFILER_PATH.parent)
+# The libraries whose calls from the app are timed, and the category they are timed in.
+# Their internal calls are not, only the call the app made.
+LIBRARIES = {"pandas": "pandas", "streamlit": "render", "altair": "render"}
+LIBRARY_PREFIXES = {"pandas": "pd", "streamlit": "st", "altair": "alt"}
+LIBRARY_CATEGORIES = set(LIBRARIES.values())
+# Decorator wrappers, their spans are named after the function they wrap.
+WRAPPERS = {"wrapped_func", "wrapper"}
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    category: str
+    start_us: int
+    frame: FrameType
+
+
+def _library_paths() -> dict[str, str]:
+    """The install path of each library, found without importing them."""
+    paths = {}
+    for library in LIBRARIES:
+        spec = importlib.util.find_spec(library)
+        if spec and spec.submodule_search_locations:
+            paths[library] = os.path.join(spec.submodule_search_locations[0], "")
+    return paths
+
+
+def _wrapped_name(frame: FrameType, name: str) -> str:
+    """Name a decorator's wrapper after the function it wraps, e.g. st.dataframe."""
+    for variable in frame.f_code.co_freevars:
+        wrapped = frame.f_locals.get(variable)
+        if callable(wrapped) and hasattr(wrapped, "__name__"):
+            return f"{name.split('.')[0]}.{wrapped.__name__}"
+    return name
+
+
+class RerunProfiler:
+    """Time the calls made during one rerun of a page.
+
+    Every function of the apps is a span, as is each call they make into pandas,
+    streamlit or altair. The spans are written as a Chrome trace, which Perfetto
+    (ui.perfetto.dev) and speedscope show as a flame graph.
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[dict[str, Any]] = []
+        self._open: dict[FrameType, Span] = {}
+        self._code: dict[CodeType, Optional[tuple[str, str]]] = {}
+        self._libraries = _library_paths()
+        self._thread = threading.get_ident()
+        self._start_us = 0
+        self.seconds = 0.0
+
+    def start(self) -> None:
+        self._start_us = time.perf_counter_ns() // 1000
+        sys.setprofile(self._profile)
+
+    def stop(self) -> None:
+        sys.setprofile(None)
+        now = time.perf_counter_ns() // 1000
+        # Spans still open when the rerun was stopped, e.g. by st.stop.
+        for span in reversed(list(self._open.values())):
+            self._close(span, now)
+        self._open.clear()
+        self.seconds = (now - self._start_us) / 1e6
+
+    def write(self, page: str, directory: Path = PROFILE_DIR) -> Path:
+        """Write the trace of the rerun.
+
+        Args:
+            page (str): The page that was rerun.
+            directory (Path, optional): Where to write the trace. Defaults to PROFILE_DIR.
+
+        Returns:
+            Path: The trace file.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^a-z0-9]+", "_", page.lower()).strip("_")
+        path = directory / f"{dt.datetime.now():%Y%m%d_%H%M%S_%f}_{slug}.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "traceEvents": self.spans,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"page": page, "seconds": self.seconds},
+                }
+            )
+        )
+        return path
+
+    def category_seconds(self) -> dict[str, float]:
+        """The time of the outermost spans of each category, slowest first.
+
+        Returns:
+            dict[str, float]: The seconds spent in each category.
+        """
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            if not span["args"]["nested"]:
+                category = span["cat"]
+                totals[category] = totals.get(category, 0.0) + span["dur"] / 1e6
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def _profile(self, frame: FrameType, event: str, arg: Any) -> None:
+        if event == "call":
+            self._call(frame)
+        elif event == "return":
+            span = self._open.pop(frame, None)
+            if span is not None:
+                self._close(span, time.perf_counter_ns() // 1000)
+
+    def _call(self, frame: FrameType) -> None:
+        code = frame.f_code
+        if code not in self._code:
+            self._code[code] = self._classify(code)
+        classified = self._code[code]
+        if classified is None:
+            return
+        name, category = classified
+        if category in LIBRARY_CATEGORIES:
+            # Only the calls the app makes, not the library's own calls.
+            parent = self._open.get(frame.f_back)
+            if parent is None or parent.category in LIBRARY_CATEGORIES:
+                return
+            if code.co_name in WRAPPERS:
+                name = _wrapped_name(frame, name)
+        self._open[frame] = Span(
+            name=name,
+            category=category,
+            start_us=time.perf_counter_ns() // 1000,
+            frame=frame,
+        )
+
+    def _classify(self, code: CodeType) -> Optional[tuple[str, str]]:
+        """The name and category of the code's spans, None if it isn't timed."""
+        # Not a file, e.g. "<frozen runpy>".
+        if code.co_filename.startswith("<"):
+            return None
+        filename = os.path.abspath(code.co_filename)
+        if filename == str(PROFILER_PATH):
+            return None
+        if filename.startswith(APPS_PATH):
+            path = os.path.relpath(filename, APPS_PATH)
+            module = path.removesuffix(".py").replace(os.sep, ".")
+            if ".models" in module:
+                category = "model"
+            elif "." in module:
+                # The page scripts, in the directory of their app.
+                category = "page"
+            else:
+                category = "app"
+            return f"{path}:{code.co_qualname}", category
+        for library, path in self._libraries.items():
+            if filename.startswith(path):
+                name = code.co_name if library == "streamlit" else code.co_qualname
+                return f"{LIBRARY_PREFIXES[library]}.{name}", LIBRARIES[library]
+        return None
+
+    def _close(self, span: Span, end_us: int) -> None:
+        self.spans.append(
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_us - self._start_us,
+                "dur": end_us - span.start_us,
+                "pid": os.getpid(),
+                "tid": self._thread,
+                "args": {"nested": self._nested(span)},
+            }
+        )
+
+    def _nested(self, span: Span) -> bool:
+        """True if the span is inside another span of its category."""
+        frame = span.frame.f_back
+        while frame is not None:
+            parent = self._open.get(frame)
+            if parent is not None and parent.category == span.category:
+                return True
+            frame = frame.f_back
+        return False
+
+
+@contextmanager
+def profile_rerun(page: str) -> Iterator[Optional[RerunProfiler]]:
+    """Profile the rerun of a page, if PROFILE_RERUNS is set, and write its trace.
+
+    Args:
+        page (str): The page being rerun.
+
+    Yields:
+        Optional[RerunProfiler]: The profiler, None if profiling is off.
+    """
+    if not PROFILE_RERUNS:
+        yield None
+        return
+    profiler = RerunProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        path = profiler.write(page)
+        breakdown = ", ".join(
+            f"{category} {seconds * 1000:.0f}ms"
+            for category, seconds in profiler.category_seconds().items()
+        )
+        # At warning, as nothing configures the root logger under streamlit run.
+        logging.warning(
+            f"Profiled {page} in {profiler.seconds * 1000:.0f}ms ({breakdown}), "
+            f"trace written to {path}"
+        )
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Query:
+    """A named SQL statement with bound parameters, e.g. `where season = :season`.
+
+    The statement text never changes between calls, only the parameters do.
+    """
+
+    name: str
+    sql: str
+    tables: tuple[str, ...]
+    ttl: Optional[int] = None
+
+
+QUERIES: dict[str, Query] = {}
+
+
+def register_query(
+    name: str, sql: str, tables: tuple[str, ...], ttl: Optional[int] = None
+) -> Query:
+    """Add a query to the registry.
+
+    Args:
+        name (str): The unique name of the query, usually `<app>.<model function>`.
+        sql (str): The SQL statement, parameters are bound with `:name`.
+        tables (tuple[str, ...]): The tables the query reads from.
+        ttl (int, optional): Seconds to cache the results for. Defaults to not caching.
+
+    Returns:
+        Query: The registered query.
+    """
+    query = Query(name=name, sql=sql, tables=tables, ttl=ttl)
+    QUERIES[name] = query
+    return query
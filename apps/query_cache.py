@@ -0,0 +1,143 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+import pandas as pd
+
+TABLE_PATTERN = re.compile(r"\b(?:from|join)\s+([a-z_][a-z0-9_]*)", re.IGNORECASE)
+
+
+@dataclass
+class CacheEntry:
+    data: pd.DataFrame
+    expires: float
+    size: int
+    tables: frozenset[str]
+
+
+class QueryCache:
+    """A memory bounded, least recently used cache of query results.
+
+    Each entry expires after its own time to live, and entries are dropped
+    when a table they read from is written to.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(sql_statement: str, params: Optional[dict[str, Any]] = None) -> tuple:
+        """Build the cache key from the normalised SQL and its parameters.
+
+        Args:
+            sql_statement (str): The SQL statement.
+            params (dict[str, Any], optional): The parameters bound to the statement.
+
+        Returns:
+            tuple: The cache key.
+        """
+        normalised_sql = " ".join(sql_statement.split())
+        normalised_params = tuple(
+            sorted(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in (params or {}).items()
+            )
+        )
+        return (normalised_sql, normalised_params)
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        """Look up a query result.
+
+        Args:
+            key (tuple): The cache key.
+
+        Returns:
+            Optional[pd.DataFrame]: A copy of the cached result, None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.data.copy()
+
+    def set(
+        self,
+        key: tuple,
+        data: pd.DataFrame,
+        ttl: int,
+        tables: Optional[frozenset[str]] = None,
+    ) -> None:
+        """Store a query result, evicting the least recently used results if over the memory bound.
+
+        Args:
+            key (tuple): The cache key.
+            data (pd.DataFrame): The query result.
+            ttl (int): Seconds the result is valid for.
+            tables (frozenset[str], optional): The tables the query reads from.
+                Defaults to the tables named in the SQL statement.
+        """
+        size = int(data.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        if tables is None:
+            tables = frozenset(table.lower() for table in TABLE_PATTERN.findall(key[0]))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(
+                data=data.copy(),
+                expires=time.monotonic() + ttl,
+                size=size,
+                tables=tables,
+            )
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop the results of every query that reads from the tables.
+
+        Args:
+            tables (str): The tables that have changed, "*" for all tables.
+        """
+        changed = {table.lower() for table in tables}
+        if "*" in changed:
+            return self.clear()
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v.tables & changed]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def statistics(self) -> dict[str, int]:
+        """Statistics of the cache, for monitoring.
+
+        Returns:
+            dict[str, int]: The entries, bytes used, hits and misses.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _remove(self, key: tuple) -> None:
+        self.size -= self._entries.pop(key).size
@@ -2,7 +2,7 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 
-from utils import auth_validation, compare_dataframes, update_data
+from utils import auth_validation, bulk_update, compare_dataframes
 from registration.models import team_data, player_data
 
 
@@ -105,18 +105,7 @@ def update_team_data(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data(
-            "teams", "manager", row["team_id"], row["manager"], value_string_type=True
-        )
-        update_data(
-            "teams",
-            "manager_mobile",
-            row["team_id"],
-            row["manager_mobile"],
-            value_string_type=True,
-        )
-        update_data("teams", "team_order", row["team_id"], row["team_order"])
+    bulk_update("teams", df, "team_id", ["manager", "manager_mobile", "team_order"])
 
 
 def input_player_team_table(df: pd.DataFrame, team_names: list[str]) -> pd.DataFrame:
@@ -169,28 +158,7 @@ def update_default_team(df: pd.DataFrame, lock: bool = True):
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data(
-            "registrations",
-            "team_id",
-            row["registration_id"],
-            row["team_id"],
-            value_string_type=True,
-        )
-        update_data(
-            "registrations",
-            "team",
-            row["registration_id"],
-            row["team"],
-            value_string_type=True,
-        )
-        update_data(
-            "registrations",
-            "grade",
-            row["registration_id"],
-            row["grade"],
-            value_string_type=True,
-        )
+    bulk_update("registrations", df, "registration_id", ["team_id", "team", "grade"])
 
 
 def teams_table(df: pd.DataFrame) -> None:
@@ -1,19 +1,11 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def player_data(season: str) -> pd.DataFrame:
-    """Extact the registered players for the current season.
-
-    Args:
-        season (str): The hockey season, usually the calendar year.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+PLAYERS = register_query(
+    "registration.player_data",
     """
-    return read_data(
-        f"""
         select
             r.id as registration_id,
             p.full_name as players_name,
@@ -26,8 +18,22 @@ def player_data(season: str) -> pd.DataFrame:
         left join teams as t
         on t.id = r.team_id
         where
-            r.season = '{ season }'
+            r.season = :season
         order by
             r.team
+    """,
+    tables=("players", "registrations", "teams"),
+    ttl=300,
+)
+
+
+def player_data(season: str) -> pd.DataFrame:
+    """Extact the registered players for the current season.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
     """
-    )
+    return read_data(PLAYERS, {"season": season})
@@ -1,16 +1,11 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def registration_count() -> pd.DataFrame:
-    """Extact the registrations count before the start of the season.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+REGISTRATION_COUNT = register_query(
+    "registration.registration_count",
     """
-    return read_data(
-        f"""
             with registration_count as (
                 select
                     season,
@@ -22,18 +17,13 @@ def registration_count() -> pd.DataFrame:
 
             select *
             from registration_count
+    """,
+    tables=("registrations",),
+    ttl=600,
+)
+REGISTRATION_DATES = register_query(
+    "registration.registration_dates",
     """
-    )
-
-
-def registration_dates() -> pd.DataFrame:
-    """Extact the registrations dates before the start of the season.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
-    """
-    return read_data(
-        f"""
             with registration_dates as (
                 select
                     id,
@@ -61,5 +51,25 @@ def registration_dates() -> pd.DataFrame:
                 registered_date::date - first_game_date::date as days_before_end_of_march
             from days_before_first_game
             where registered_date::date - first_game_date::date <= 0
+    """,
+    tables=("registrations",),
+    ttl=600,
+)
+
+
+def registration_count() -> pd.DataFrame:
+    """Extact the registrations count before the start of the season.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    return read_data(REGISTRATION_COUNT)
+
+
+def registration_dates() -> pd.DataFrame:
+    """Extact the registrations dates before the start of the season.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
     """
-    )
+    return read_data(REGISTRATION_DATES)
@@ -3,11 +3,19 @@ from enum import Enum, auto
 from typing import Optional
 import pandas as pd
 import streamlit as st
-from streamlit_calendar import calendar
 
 from utils import select_box_query
+from assets import served_asset
+from logos import club_logo_url
 from config import config
-from result.models import team_names, game_rounds, game_results_data
+from result.models import (
+    team_names,
+    game_rounds,
+    game_results_data,
+    game_results_page,
+    prefetch_game_results_page,
+)
+from result.records import records_from_frame
 
 
 class Result(Enum):
@@ -16,13 +24,21 @@ class Result(Enum):
     LOSS = auto()
 
 
-@dataclass
+# The columns of the game results, by the fields of Game.
+GAME_COLUMNS = {
+    "location": "location_name",
+    "start_time": "start_ts",
+    "opposition_team": "opposition",
+}
+
+
+@dataclass(slots=True)
 class Game:
     round: str
     grade: str
     location: str
     field: str
-    start_time: str
+    start_time: pd.Timestamp
     team: str
     opposition_team: str
     goals_for: int
@@ -39,11 +55,11 @@ class Game:
 
     @property
     def team_logo_url(self):
-        return _club_logo_url(self.team)
+        return served_asset(club_logo_url(self.team))
 
     @property
     def opposition_team_logo_url(self):
-        return _club_logo_url(self.opposition_team)
+        return served_asset(club_logo_url(self.opposition_team))
 
     def to_dict(self):
         return {
@@ -80,7 +96,6 @@ def main() -> None:
 
     # Filter to choose how to view the results
     result_views = {
-        "Tiles": results_tile,
         "Calendar": results_calendar,
         "Table": results_table,
     }
@@ -89,34 +104,68 @@ def main() -> None:
 
     show_applied_filters(season=season, team=team, round=game_round)
 
+    if view == "Tiles":
+        results_tile_pages(season=season, team=team, game_round=game_round)
+        return
+
     game_results = load_game_results(season=season, team=team, game_round=game_round)
     if not game_results:
         st.warning(f"""No games results found.""")
         return
 
-    result_views.get(view, "Tiles")(game_results)
+    result_views[view](game_results)
 
 
 def load_game_results(season: str, team: str, game_round: str) -> Optional[list[Game]]:
     game_results = game_results_data(season, team, game_round)
     if not game_results.shape[0]:
         return
-    games = []
-    for _, game in game_results.iterrows():
-        games += [
-            Game(
-                round=str(game["round"]),
-                grade=game["grade"],
-                location=game["location_name"],
-                field=game["field"],
-                start_time=game["start_ts"],
-                team=game["team"],
-                opposition_team=game["opposition"],
-                goals_for=game["goals_for"],
-                goals_against=game["goals_against"],
-            )
-        ]
-    return games
+    return records_from_frame(Game, game_results, GAME_COLUMNS)
+
+
+def results_tile_pages(season: str, team: str, game_round: str) -> None:
+    """Display one page of results as tiles, only fetching that page's games.
+
+    The next page is fetched in the background, so paging forward is served from the cache.
+    """
+    col1, _, col2 = st.columns([2, 4, 2], gap="small", vertical_alignment="bottom")
+    page_sizes = sorted({10, 20, 50, config.app.results_page_size})
+    page_size = col2.selectbox(
+        "Games per page",
+        page_sizes,
+        index=page_sizes.index(config.app.results_page_size),
+    )
+    page_key = _page_key(season, team, game_round, page_size)
+    page = st.session_state.get(page_key, 1)
+    game_results = game_results_page(season, team, game_round, page, page_size)
+    if not game_results.shape[0] and page > 1:
+        # There are fewer pages than when the page was chosen, show the last page.
+        first_page = game_results_page(season, team, game_round, 1, page_size)
+        if first_page.shape[0]:
+            total_games = int(first_page["total_games"].iloc[0])
+            page = min(page, -(-total_games // page_size))
+            game_results = game_results_page(season, team, game_round, page, page_size)
+        else:
+            page, game_results = 1, first_page
+        st.session_state[page_key] = page
+    if not game_results.shape[0]:
+        st.warning(f"""No games results found.""")
+        return
+    pages = -(-int(game_results["total_games"].iloc[0]) // page_size)
+    col1.number_input(
+        f"Page (of { pages })",
+        min_value=1,
+        max_value=pages,
+        key=page_key,
+    )
+    if page < pages:
+        prefetch_game_results_page(season, team, game_round, page + 1, page_size)
+    results_tile(records_from_frame(Game, game_results, GAME_COLUMNS))
+
+
+def _page_key(season: str, team: str, game_round: str, page_size: int) -> str:
+    """Changing the filters starts again from the first page."""
+    return f"results_page_{ season }_{ team }_{ game_round }_{ page_size }"
 
 
 def results_tile(games: list[Game]):
@@ -127,8 +176,6 @@ def results_tile(games: list[Game]):
     """
     # present results
     for game in games:
-        if game.opposition_team == "BYE":
-            continue
         with st.container(border=True):
             results_layout(
                 game.round,
@@ -236,6 +283,9 @@ def results_calendar(games: list[Game]):
 
 
 def _calendar_config(events: dict, options: dict):
+    # Imported here, so the other views don't pay for loading the component.
+    from streamlit_calendar import calendar
+
     calendar(
         events=events,
         options=options,
@@ -268,40 +318,4 @@ def results_table(games: list[Game]) -> None:
     st.dataframe(_results, hide_index=True, use_container_width=True)
 
 
-def _club_logo_url(team_name: str) -> str:
-    """Find the club name in the team name.
-
-    Args:
-        team_name (str): The raw team name.
-
-    Returns:
-        str: The url to the team logo.
-    """
-    _team_name = team_name.upper()
-    clean_name = ""
-    if "WEST" in _team_name:
-        clean_name = "West"
-    if "UNI" in _team_name:
-        clean_name = "University"
-    if "TIGER" in _team_name:
-        clean_name = "Tigers"
-    if "SOUTH" in _team_name:
-        clean_name = "Souths"
-    if "UNI" in _team_name:
-        clean_name = "University"
-    if "PORT" in _team_name:
-        clean_name = "Port Stephens"
-    if "NORTH" in _team_name:
-        clean_name = "Norths"
-    if "MAITLAND" in _team_name:
-        clean_name = "Maitland"
-    if "GOSFORD" in _team_name:
-        clean_name = "Gosford"
-    if "CRUSADER" in _team_name:
-        clean_name = "Crusaders"
-    if "COLT" in _team_name:
-        clean_name = "Colts"
-    return config.app.logo_assets.get(clean_name)
-
-
 main()
@@ -1,3 +1,14 @@
 from .team_data import team_results_data, team_names
 from .player_data import player_data, player_names
-from .games_data import game_rounds, game_results_data
+from .games_data import (
+    game_rounds,
+    game_results_data,
+    game_results_page,
+    prefetch_game_results_page,
+)
+from .leaderboard_data import (
+    leaderboard_data,
+    top_scorers,
+    most_carded,
+    club_goals_rank,
+)
@@ -1,12 +1,14 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def game_rounds() -> pd.DataFrame:
-    df = read_data(
-        """
+GAME_ROUNDS = register_query(
+    "result.game_rounds",
+    """
         select
             distinct
             round,
@@ -17,40 +19,17 @@ def game_rounds() -> pd.DataFrame:
                 else round
             end as round_order
         from games
-        """
-    )
-    df.loc[:, "round_order"] = df.loc[:, "round_order"].astype(float)
-    df = df.sort_values("round_order")["round"]
-    return df
-
-
-def game_results_data(
-    season: str, team: Optional[str] = None, game_round: Optional[str] = None
-) -> pd.DataFrame:
-    """Extact the outstanding club fees.
-
-    Args:
-        season (str): The hockey season, usually the calendar year.
-        team (str, optional): The teams name.
-        game_round (str, optional): The round of the season.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
-    """
-    filters = ["where", f"g.season = '{ season }'"]
-    if team:
-        filters.append("and")
-        filters.append(f"t.team || ' - ' || t.grade = '{ team }'")
-    if game_round:
-        filters.append("and")
-        filters.append(f"g.round = '{ game_round }'")
-    df = read_data(
-        f"""
+        """,
+    tables=("games",),
+    ttl=600,
+)
+GAME_RESULTS_SQL = """
         select
             g.id,
+            t.team_order,
             t.team,
             t.grade,
-            t.team || ' - ' || t.grade as team_name,
+            t.team_name,
             g.season,
             g.round,
             case
@@ -81,11 +60,75 @@ def game_results_data(
         on g.team_id = t.id
         left join locations as l
         on g.location_id = l.id
-        { " ".join(filters) }
+        where
+            g.season = :season
+            and (
+                cast(:team as text) is null
+                or t.team_name = :team
+            )
+            and (
+                cast(:game_round as text) is null
+                or g.round = :game_round
+            )
         order by
             t.team_order,
             g.start_ts
-        """
+"""
+GAME_RESULTS = register_query(
+    "result.game_results_data",
+    GAME_RESULTS_SQL,
+    tables=("games", "teams", "locations"),
+    ttl=300,
+)
+# Prefetches pages of results, one at a time, so paging quickly can't take more than
+# one pooled connection. Module level, as the page scripts are re-executed each rerun.
+_PREFETCH = ThreadPoolExecutor(max_workers=1, thread_name_prefix="results_prefetch")
+# The pages queued or being fetched, by their args.
+_PREFETCHING: set[tuple] = set()
+_PREFETCHING_LOCK = threading.Lock()
+# One page of the results, byes excluded, with the number of games across all pages.
+GAME_RESULTS_PAGE = register_query(
+    "result.game_results_page",
+    f"""
+        select
+            *,
+            count(*) over () as total_games
+        from ({ GAME_RESULTS_SQL }) as game_results
+        where opposition is distinct from 'BYE'
+        order by
+            team_order,
+            start_ts,
+            id
+        limit :limit
+        offset :offset
+        """,
+    tables=("games", "teams", "locations"),
+    ttl=300,
+)
+
+
+def game_rounds() -> pd.DataFrame:
+    df = read_data(GAME_ROUNDS)
+    df.loc[:, "round_order"] = df.loc[:, "round_order"].astype(float)
+    df = df.sort_values("round_order")["round"]
+    return df
+
+
+def game_results_data(
+    season: str, team: Optional[str] = None, game_round: Optional[str] = None
+) -> pd.DataFrame:
+    """Extact the outstanding club fees.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        team (str, optional): The teams name.
+        game_round (str, optional): The round of the season.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    df = read_data(
+        GAME_RESULTS, {"season": season, "team": team, "game_round": game_round}
     )
     df.loc[:, "goals_for"] = (
         df.loc[:, "goals_for"].replace("", 0).astype(float).astype(int)
@@ -94,3 +137,75 @@ def game_results_data(
         df.loc[:, "goals_against"].replace("", 0).astype(float).astype(int)
     )
     return df
+
+
+def game_results_page(
+    season: str,
+    team: Optional[str] = None,
+    game_round: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> pd.DataFrame:
+    """One page of the game results, sliced in the database.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        team (str, optional): The teams name.
+        game_round (str, optional): The round of the season.
+        page (int, optional): The page, starting at 1. Defaults to 1.
+        page_size (int, optional): The games per page. Defaults to 20.
+
+    Returns:
+        pd.DataFrame: The games of the page, with the total_games of all pages.
+    """
+    df = read_data(
+        GAME_RESULTS_PAGE,
+        {
+            "season": season,
+            "team": team,
+            "game_round": game_round,
+            "limit": page_size,
+            "offset": (page - 1) * page_size,
+        },
+    )
+    df.loc[:, "goals_for"] = (
+        df.loc[:, "goals_for"].replace("", 0).astype(float).astype(int)
+    )
+    df.loc[:, "goals_against"] = (
+        df.loc[:, "goals_against"].replace("", 0).astype(float).astype(int)
+    )
+    return df
+
+
+def prefetch_game_results_page(
+    season: str,
+    team: Optional[str] = None,
+    game_round: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> None:
+    """Fetch a page of the game results into the cache in the background.
+
+    A page already queued or being fetched isn't queued again.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        team (str, optional): The teams name.
+        game_round (str, optional): The round of the season.
+        page (int, optional): The page, starting at 1. Defaults to 1.
+        page_size (int, optional): The games per page. Defaults to 20.
+    """
+    args = (season, team, game_round, page, page_size)
+    with _PREFETCHING_LOCK:
+        if args in _PREFETCHING:
+            return
+        _PREFETCHING.add(args)
+
+    def fetch() -> None:
+        try:
+            game_results_page(*args)
+        finally:
+            with _PREFETCHING_LOCK:
+                _PREFETCHING.discard(args)
+
+    _PREFETCH.submit(fetch)
@@ -0,0 +1,104 @@
+import pandas as pd
+
+from queries import register_query
+from utils import read_data
+
+LEADERBOARD = register_query(
+    "result.leaderboard_data",
+    """
+        select
+            ps.player_id,
+            p.full_name as player,
+            ps.team_id,
+            t.team_name,
+            ps.games_played,
+            ps.games_won,
+            ps.goals,
+            ps.green_cards + ps.yellow_cards + ps.red_cards as cards,
+            row_number() over (
+                partition by ps.team_id
+                order by ps.goals desc, ps.games_played
+            ) as team_goals_rank,
+            row_number() over (
+                partition by ps.team_id
+                order by
+                    ps.red_cards desc,
+                    ps.yellow_cards desc,
+                    ps.green_cards desc
+            ) as team_cards_rank
+        from player_season_stats as ps
+        inner join players as p
+        on ps.player_id = p.id
+        inner join teams as t
+        on ps.team_id = t.id
+        where ps.season = :season
+        """,
+    # The rollup is refreshed by triggers on these tables, so writes to them change it.
+    tables=(
+        "player_season_stats",
+        "players",
+        "teams",
+        "results",
+        "selections",
+        "games",
+    ),
+    ttl=300,
+)
+
+
+def leaderboard_data(season: str) -> pd.DataFrame:
+    """The season totals of every player, per team they played for.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+
+    Returns:
+        pd.DataFrame: The results of the query.
+    """
+    return read_data(LEADERBOARD, {"season": season})
+
+
+def top_scorers(season: str, limit: int = 3) -> pd.DataFrame:
+    """The leading goal scorers of each team.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        limit (int, optional): The number of players per team. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: The players with goals, ordered by team and goals.
+    """
+    df = leaderboard_data(season)
+    df = df[(df["team_goals_rank"] <= limit) & (df["goals"] > 0)]
+    return df.sort_values(["team_name", "team_goals_rank"])
+
+
+def most_carded(season: str, limit: int = 3) -> pd.DataFrame:
+    """The players of each team with the most cards, red cards weigh the most.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        limit (int, optional): The number of players per team. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: The players with cards, ordered by team and cards.
+    """
+    df = leaderboard_data(season)
+    df = df[(df["team_cards_rank"] <= limit) & (df["cards"] > 0)]
+    return df.sort_values(["team_name", "team_cards_rank"])
+
+
+def club_goals_rank(season: str, player_id: str) -> int:
+    """The player's position in the club's goal scorers, across all their teams.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        player_id (str): The id of the player.
+
+    Returns:
+        int: The position, 0 if the player hasn't played this season.
+    """
+    goals = leaderboard_data(season).groupby("player_id")["goals"].sum()
+    if player_id not in goals.index:
+        return 0
+    return int(goals.rank(method="min", ascending=False)[player_id])
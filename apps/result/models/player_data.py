@@ -1,17 +1,11 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def player_data(player_id: str, season: str) -> pd.DataFrame:
-    """The data for the player
-
-    Args:
-        player_id str: The id of the player.
-        season str: The hockey season.
+PLAYER = register_query(
+    "result.player_data",
     """
-    df = read_data(
-        f"""
        select
             p.id as player_id,
             p.full_name as player,
@@ -41,7 +35,16 @@ def player_data(player_id: str, season: str) -> pd.DataFrame:
             coalesce(re.green_card, 0) as green_card,
             coalesce(re.yellow_card, 0) as yellow_card,
             coalesce(re.red_card, 0) as red_card,
-            coalesce(re.green_card, 0) + coalesce(re.yellow_card, 0) + coalesce(re.red_card, 0) as cards
+            coalesce(re.green_card, 0) + coalesce(re.yellow_card, 0) + coalesce(re.red_card, 0) as cards,
+            count(*) over () as games_played,
+            count(*) filter (
+                where nullif(g.goals_for::text, '')::numeric
+                    > nullif(g.goals_against::text, '')::numeric
+            ) over () as games_won,
+            sum(coalesce(re.goals, 0)) over () as total_goals,
+            sum(coalesce(re.green_card, 0)) over () as total_green_cards,
+            sum(coalesce(re.yellow_card, 0)) over () as total_yellow_cards,
+            sum(coalesce(re.red_card, 0)) over () as total_red_cards
         from players as p
         inner join registrations as r
         on p.id = r.player_id
@@ -58,37 +61,33 @@ def player_data(player_id: str, season: str) -> pd.DataFrame:
         on g.location_id = l.id
         where
             s.played = true and
-            p.id = '{player_id}' and
-            r.season = '{season}'
-        """
-    )
-    df.loc[:, "goals_for"] = (
-        df.loc[:, "goals_for"].replace("", 0).astype(float).astype(int)
-    )
-    df.loc[:, "goals_against"] = (
-        df.loc[:, "goals_against"].replace("", 0).astype(float).astype(int)
-    )
-    return df
-
-
-def player_names(season: str) -> pd.DataFrame:
-    return read_data(
-        f"""
+            p.id = :player_id and
+            r.season = :season
+        order by
+            g.start_ts
+        """,
+    tables=(
+        "players",
+        "registrations",
+        "selections",
+        "results",
+        "games",
+        "teams",
+        "locations",
+    ),
+    ttl=300,
+)
+PLAYER_NAMES = register_query(
+    "result.player_names",
+    """
         with _goals as (
             select
-                s.player_id,
-                sum(r.goals) as goals
-
-            from games as g
-            inner join selections as s
-            on g.id = s.game_id
-            inner join results as r
-            on s.id = r.id
-            where
-                s.played = true and
-                g.season = '{season}'
+                player_id,
+                sum(goals) as goals
+            from player_season_stats
+            where season = :season
             group by
-                s.player_id
+                player_id
         )
 
         select
@@ -99,8 +98,40 @@ def player_names(season: str) -> pd.DataFrame:
         on r.player_id = p.id
         left join _goals as g
         on p.id = g.player_id
-        where r.season = '{season}'
+        where r.season = :season
         order by
             coalesce(g.goals, 0) desc
-        """
+        """,
+    # The rollup is refreshed by triggers on these tables, so writes to them change it.
+    tables=(
+        "player_season_stats",
+        "registrations",
+        "players",
+        "results",
+        "selections",
+        "games",
+    ),
+    ttl=300,
+)
+
+
+def player_data(player_id: str, season: str) -> pd.DataFrame:
+    """The games the player played in the season, one row per game, with the
+    player's season totals repeated on every row.
+
+    Args:
+        player_id str: The id of the player.
+        season str: The hockey season.
+    """
+    df = read_data(PLAYER, {"player_id": player_id, "season": season})
+    df.loc[:, "goals_for"] = (
+        df.loc[:, "goals_for"].replace("", 0).astype(float).astype(int)
+    )
+    df.loc[:, "goals_against"] = (
+        df.loc[:, "goals_against"].replace("", 0).astype(float).astype(int)
     )
+    return df
+
+
+def player_names(season: str) -> pd.DataFrame:
+    return read_data(PLAYER_NAMES, {"season": season})
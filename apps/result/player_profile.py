@@ -6,7 +6,8 @@ import streamlit as st
 
 from config import config
 from utils import select_box_query
-from result.models import player_data, player_names
+from result.models import player_data, player_names, club_goals_rank
+from result.records import records_from_frame
 
 
 class Result(Enum):
@@ -15,7 +16,17 @@ class Result(Enum):
     LOSS = auto()
 
 
-@dataclass
+# The columns of the player's games, by the fields of Game.
+GAME_COLUMNS = {
+    "location": "location_name",
+    "individual_goals": "goals",
+    "individual_cards": "cards",
+    "team_goals_for": "goals_for",
+    "team_goals_against": "goals_against",
+}
+
+
+@dataclass(slots=True)
 class Game:
     team: str
     grade: str
@@ -51,21 +62,18 @@ class Game:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     grade: str
     games_played: int
+    games_won: int
     goals: int
     green_cards: int
     yellow_cards: int
     red_cards: int
     games: list[Game]
 
-    @property
-    def games_won(self) -> int:
-        return sum([1 for game in self.games if game.result == Result.WIN])
-
     @property
     def total_cards(self) -> int:
         return self.green_cards + self.yellow_cards + self.red_cards
@@ -112,7 +120,7 @@ def main() -> None:
 
     display_html_header(player_results.name, season, player_results.grade)
 
-    display_metrics(player_results)
+    display_metrics(player_results, club_goals_rank(season, player_id))
 
     display_games_table(player_results.games)
 
@@ -122,30 +130,18 @@ def load_player_results(player_id: str, season: str) -> Optional[Player]:
     if not players_games.shape[0]:
         st.warning(f"No games found for player in the {season} season")
         return
-    games = []
-    for _, game in players_games.iterrows():
-        games += [
-            Game(
-                team=game["team"],
-                grade=game["grade"],
-                round=game["round"],
-                location=game["location_name"],
-                opposition=game["opposition"],
-                individual_goals=int(game["goals"]),
-                individual_cards=int(game["cards"]),
-                team_goals_for=int(game["goals_for"]),
-                team_goals_against=int(game["goals_against"]),
-            )
-        ]
+    # The season totals are the same on every row.
+    totals = players_games.iloc[0]
     return Player(
-        name=players_games["player"].unique()[0],
-        grade=players_games["player_graded"].unique()[0],
-        games_played=int(players_games.shape[0]),
-        goals=int(players_games["goals"].sum()),
-        green_cards=int(players_games["green_card"].sum()),
-        yellow_cards=int(players_games["yellow_card"].sum()),
-        red_cards=int(players_games["red_card"].sum()),
-        games=games,
+        name=totals["player"],
+        grade=totals["player_graded"],
+        games_played=int(totals["games_played"]),
+        games_won=int(totals["games_won"]),
+        goals=int(totals["total_goals"]),
+        green_cards=int(totals["total_green_cards"]),
+        yellow_cards=int(totals["total_yellow_cards"]),
+        red_cards=int(totals["total_red_cards"]),
+        games=records_from_frame(Game, players_games, GAME_COLUMNS),
     )
 
 
@@ -177,15 +173,16 @@ def display_html_header(player_name: str, season: str, grade: str):
     )
 
 
-def display_metrics(player: Player) -> None:
-    col1, col2, col3, col4, col5 = st.columns(
-        [1, 1, 1, 1, 1], gap="small", vertical_alignment="center"
+def display_metrics(player: Player, goals_rank: int) -> None:
+    col1, col2, col3, col4, col5, col6 = st.columns(
+        [1, 1, 1, 1, 1, 1], gap="small", vertical_alignment="center"
     )
     col1.metric("Games played", player.games_played)
     col2.metric("Games won %", player.percent_games_won)
     col3.metric("Goals", player.goals)
     col4.metric("Goals per game", player.goals_per_game)
     col5.metric("Cards", player.total_cards)
+    col6.metric("Club goals rank", goals_rank if goals_rank else "-")
 
 
 def display_games_table(games: list[Game]) -> None:
@@ -0,0 +1,54 @@
+from dataclasses import fields
+from typing import Optional, TypeVar
+import pandas as pd
+
+Record = TypeVar("Record")
+
+# The field types coerced column by column, other types are passed through as read.
+COERCED_TYPES = {int: "int64", float: "float64", bool: "bool"}
+
+
+def records_from_frame(
+    record_type: type[Record],
+    df: pd.DataFrame,
+    columns: Optional[dict[str, str]] = None,
+) -> list[Record]:
+    """Build a record for each row of the dataframe, converting whole columns at once.
+
+    Args:
+        record_type (type[Record]): The dataclass to build.
+        df (pd.DataFrame): The rows.
+        columns (dict[str, str], optional): The dataframe column of each field, where
+            the names differ. Defaults to the field names.
+
+    Raises:
+        ValueError: If a column is missing, or can't be converted to the field type.
+
+    Returns:
+        list[Record]: The records, in the order of the rows.
+    """
+    columns = columns or {}
+    record_fields = fields(record_type)
+    source_columns = [columns.get(field.name, field.name) for field in record_fields]
+    missing = [column for column in source_columns if column not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Columns missing to build {record_type.__name__}: {', '.join(missing)}"
+        )
+    df = df[source_columns].set_axis([field.name for field in record_fields], axis=1)
+    for field in record_fields:
+        try:
+            df[field.name] = _coerce(df[field.name], field.type)
+        except (TypeError, ValueError) as error:
+            raise ValueError(
+                f"Column {field.name} of {record_type.__name__} isn't {field.type.__name__}: {error}"
+            ) from error
+    return [record_type(*row) for row in df.itertuples(index=False, name=None)]
+
+
+def _coerce(column: pd.Series, field_type: type) -> pd.Series:
+    if field_type in COERCED_TYPES:
+        return column.astype(COERCED_TYPES[field_type])
+    if field_type is str:
+        return column.where(column.isna(), column.astype(str))
+    return column
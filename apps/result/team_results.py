@@ -1,15 +1,17 @@
 from dataclasses import dataclass
 from typing import Optional
+import pandas as pd
 import streamlit as st
 
 from config import config
 from utils import select_box_query
-from result.models import team_results_data
+from result.models import team_results_data, top_scorers
+from result.records import records_from_frame
 
 # TODO: Add games table
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     name: str
     games_played: int
@@ -50,6 +52,8 @@ def main() -> None:
         return
 
     detail = st.toggle("Add additional statistics")
+    if detail:
+        scorers = top_scorers(season)
     for team in team_results:
         with st.container(border=True):
             team_layout(
@@ -68,36 +72,18 @@ def main() -> None:
                     team.goal_difference,
                     team.points_percentage,
                 )
-
-            # TODO: add in top scorers
-            # st.warning("Not fully implemented")
-            # st.write("Top Goal Scorers")
-            # # Data for the table (replace with your actual data)
-            # data = [
-            #     {"Name": "John Doe", "Goals": 15},
-            #     {"Name": "Jane Smith", "Goals": 12},
-            #     # Add more rows as needed
-            # ]
-            # st.table(data)
+                display_top_scorers(scorers[scorers["team_name"] == team.name])
 
 
 def load_team_results(season: str) -> Optional[list[Team]]:
     team_results = team_results_data(season)
     if not team_results.shape[0]:
         return
-    teams = []
-    for _, row in team_results.iterrows():
-        teams += [
-            Team(
-                name=row["team_name"],
-                games_played=int(row["games_played"]),
-                wins=int(row["win"]),
-                losses=row["loss"],
-                draws=row["draw"],
-                goals_for=row["goals_for"],
-                goals_against=row["goals_against"],
-            )
-        ]
+    teams = records_from_frame(
+        Team,
+        team_results,
+        {"name": "team_name", "wins": "win", "losses": "loss", "draws": "draw"},
+    )
     return teams
 
 
@@ -105,6 +91,17 @@ def display_team_results():
     pass
 
 
+def display_top_scorers(scorers: pd.DataFrame) -> None:
+    if not scorers.shape[0]:
+        return
+    st.write("Top Goal Scorers")
+    st.table(
+        scorers[["player", "goals", "games_played"]]
+        .rename(columns={"player": "Name", "goals": "Goals", "games_played": "Games"})
+        .set_index("Name")
+    )
+
+
 def team_layout(
     team_name: str,
     games_played: int,
@@ -8,9 +8,9 @@ from utils import (
     auth_validation,
     select_box_query,
     add_timestamp,
+    bulk_insert,
+    bulk_update,
     compare_dataframes,
-    create_data,
-    update_data,
 )
 from selection.file_loader import FileUploader
 from selection.models import (
@@ -294,31 +294,24 @@ def write_game_data(
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    create_data(
+    timestamp = str(add_timestamp())
+    bulk_insert(
         "games",
-        (
-            "id",
-            "create_ts",
-            "update_ts",
-            "season",
-            "team_id",
-            "location_id",
-            "round",
-            "finals",
-            "opposition",
-            "start_ts",
-        ),
-        (
-            id,
-            str(add_timestamp()),
-            str(add_timestamp()),
-            season,
-            team_id,
-            location_id,
-            round,
-            finals,
-            opposition,
-            start_ts,
+        pd.DataFrame(
+            [
+                {
+                    "id": id,
+                    "create_ts": timestamp,
+                    "update_ts": timestamp,
+                    "season": season,
+                    "team_id": team_id,
+                    "location_id": location_id,
+                    "round": round,
+                    "finals": finals,
+                    "opposition": opposition,
+                    "start_ts": start_ts,
+                }
+            ]
         ),
     )
 
@@ -336,17 +329,13 @@ def update_game_results(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data(
-            "games",
-            "start_ts",
-            row["game_id"],
-            row["start_ts"],
-            value_string_type=True,
-            verbose=True,
-        )
-        update_data("games", "goals_for", row["game_id"], row["goals_for"])
-        update_data("games", "goals_against", row["game_id"], row["goals_against"])
+    bulk_update(
+        "games",
+        df,
+        "game_id",
+        ["start_ts", "goals_for", "goals_against"],
+        verbose=True,
+    )
 
 
 main()
@@ -1,6 +1,7 @@
-from .game_data import game_data, game_selection_data, last_game_date
+from .game_data import game_data, game_selection_data, last_game_date, latest_round
 from .teams_data import team_data, team_id_data
 from .location_data import location_name_data, location_id_data
 from .field_data import field_name_data
 from .player_data import player_data
 from .selection_data import selections_input_data, selections_output_data
+from .week_data import week_window, refresh_week_window
@@ -1,7 +1,15 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
+FIELD_NAMES = register_query(
+    "selection.field_name_data",
+    """select field from locations""",
+    tables=("locations",),
+    ttl=3600,
+)
+
 
 def field_name_data() -> pd.DataFrame:
-    return read_data("""select field from locations""")
+    return read_data(FIELD_NAMES)
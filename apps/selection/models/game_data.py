@@ -1,30 +1,16 @@
 import datetime as dt
+from dataclasses import dataclass
+from typing import Optional
 import streamlit as st
 import pandas as pd
 
-from utils import read_data, calculate_date_interval
+from queries import register_query
+from utils import read_data
+from .week_data import week_window
 
-
-def game_data(
-    season: str, date_end: dt.datetime = None, date_inteval: int = 6
-) -> pd.DataFrame:
-    """Extact the game data for the week.
-
-    Args:
-        season (str): The hockey season, usually the calendar year.
-        date_end (dt.datetime): The end timestamp.
-        date_inteval (int, optional): How many days before the date_end to include. Defualts to 6.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+GAMES = register_query(
+    "selection.game_data",
     """
-    filters = [f"g.season = '{ season }'"]
-    if date_end:
-        date_start = date_end - dt.timedelta(days=date_inteval)
-        filters.append("and")
-        filters.append(f"g.start_ts between '{ date_start }' and '{ date_end }'")
-    df = read_data(
-        f"""
         with _selections as (
             select
                 game_id,
@@ -39,7 +25,7 @@ def game_data(
             g.create_ts,
             g.update_ts,
             g.id as game_id,
-            t.team || ' - ' || t.grade as team_name,
+            t.team_name,
             g.opposition,
             g.start_ts,
             g.round,
@@ -59,17 +45,62 @@ def game_data(
         on g.team_id = t.id
         left join _selections as s
         on g.id = s.game_id
-        where { ' '.join(filters) }
+        where
+            g.season = :season
         order by
             t.team_order
-        """
-    ).replace("", None)
-    ### Format the game start time ###
-    df.loc[:, "game_time"] = pd.to_datetime(df.loc[:, "start_ts"]).dt.strftime(
-        "%a %d %B, %-I:%M %p"
-    )
-    df.loc[:, "start_ts"] = pd.to_datetime(df.loc[:, "start_ts"])
-    df.loc[:, "round_order"] = df.loc[:, "round_order"].astype(int)
+    """,
+    tables=("games", "teams", "selections"),
+    ttl=300,
+)
+LATEST_ROUND = register_query(
+    "selection.latest_round",
+    """
+        select
+            g.start_ts::date as game_date,
+            g.round
+        from games as g
+        where
+            g.season = :season
+            and g.start_ts < now()
+        order by
+            g.start_ts desc
+        limit 1
+    """,
+    tables=("games",),
+    # The latest round depends on now(), so it is kept as briefly as the other queries.
+    ttl=300,
+)
+
+
+@dataclass(frozen=True)
+class LatestRound:
+    """The last round of the season to have started."""
+
+    game_date: dt.date
+    round: str
+
+
+def game_data(season: str, date_end: dt.datetime = None) -> pd.DataFrame:
+    """Extact the game data for the week, or the whole season.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        date_end (dt.datetime, optional): The end of the week. Defaults to the whole season.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    if date_end:
+        df = week_window(season, date_end).games.copy()
+    else:
+        df = read_data(GAMES, {"season": season}).replace("", None)
+        ### Format the game start time ###
+        df["start_ts"] = pd.to_datetime(df["start_ts"])
+        df.loc[:, "game_time"] = df.loc[:, "start_ts"].dt.strftime(
+            "%a %d %B, %-I:%M %p"
+        )
+        df.loc[:, "round_order"] = df.loc[:, "round_order"].astype(int)
     df = df.sort_values(["team_order", "round_order"])
     ### game validation ###
     if not df.dropna(subset=["game_id"]).shape[0]:
@@ -93,69 +124,48 @@ def game_data(
     ]
 
 
-def game_selection_data(
-    season: str, date_end: dt.datetime, date_inteval: int = 6
-) -> pd.DataFrame:
+def game_selection_data(season: str, date_end: dt.datetime) -> pd.DataFrame:
     """Extact the game data for the week.
 
     Args:
         season (str): The hockey season, usually the calendar year.
         date_end (dt.datetime): The end timestamp.
-        date_inteval (int, optional): How many days before the date_end to include. Defualts to 6.
 
     Retuns:
         pd.DataFrame: The results of the query.
     """
-    date_start, date_end = calculate_date_interval(date_end, date_inteval)
-    df = read_data(
-        f"""
-        with count_selections as (
-            select
-                game_id,
-                count(*) as players_selected
-            from selections
-            where selected = true
-            group by
-                game_id
-        )
-
-        select
-            g.id,
-            t.grade,
-            t.team,
-            t.team || ' - ' || t.grade as team_name,
-            g.opposition,
-            g.start_ts,
-            g.round,
-            cs.players_selected
-        from games as g
-        inner join teams as t
-        on g.team_id = t.id
-        left join count_selections as cs
-        on g.id = cs.game_id
-        where
-            g.season = '{ season }'
-            and g.start_ts between '{ date_start }' and '{ date_end }'
-        order by
-            t.team_order
-        """
-    ).replace("", None)
+    df = week_window(season, date_end).games
     ### game validation ###
     if not df.shape[0]:
         return pd.DataFrame()
-    df.loc[:, "game_time"] = pd.to_datetime(df.loc[:, "start_ts"]).dt.strftime(
-        "%a %d %B, %-I:%M %p"
-    )
     return df[["round", "team_name", "opposition", "game_time", "players_selected"]]
 
 
-def last_game_date(season: str) -> pd.DataFrame:
-    read_data(
-        f"""
-        select max(start_ts) + INTERVAL '1 days' as max_ts
-        from games
-        where
-            season = '{ season }'
-            and start_ts < '{ dt.datetime.now() }'
-        """
-    ).iloc[0, 0]
+def latest_round(season: str) -> Optional[LatestRound]:
+    """The date and round of the latest game played in the season.
+
+    Cached per season until a game is written.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+
+    Retuns:
+        Optional[LatestRound]: The latest round, or None if no games have been played.
+    """
+    df = read_data(LATEST_ROUND, {"season": season})
+    if not df.shape[0]:
+        return None
+    return LatestRound(game_date=df.loc[0, "game_date"], round=df.loc[0, "round"])
+
+
+def last_game_date(season: str) -> Optional[dt.date]:
+    """The date of the latest game played in the season.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+
+    Retuns:
+        Optional[dt.date]: The date, or None if no games have been played.
+    """
+    latest = latest_round(season)
+    return latest.game_date if latest else None
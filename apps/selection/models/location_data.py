@@ -1,13 +1,25 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
+LOCATION_NAMES = register_query(
+    "selection.location_name_data",
+    """select distinct name from locations""",
+    tables=("locations",),
+    ttl=3600,
+)
+LOCATION_ID = register_query(
+    "selection.location_id_data",
+    """select id from locations where name = :location and field = :field""",
+    tables=("locations",),
+    ttl=3600,
+)
+
 
 def location_name_data() -> pd.DataFrame:
-    return read_data("""select distinct name from locations""")
+    return read_data(LOCATION_NAMES)
 
 
 def location_id_data(location: str, field: str) -> pd.DataFrame:
-    return read_data(
-        f"""select id from locations where name = '{location}' and field = '{field}'"""
-    )
+    return read_data(LOCATION_ID, {"location": location, "field": field})
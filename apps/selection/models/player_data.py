@@ -1,27 +1,17 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
-
-def player_data(season: str, team_round: str, team: str) -> pd.DataFrame:
-    """Extact the player data for the team and round.
-
-    Args:
-        season (str): The hockey season, usually the calendar year.
-        team_round (str): The teams round of the season.
-        team (str): The team results are being updated for.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+PLAYERS = register_query(
+    "selection.player_data",
     """
-    df = read_data(
-        f"""
         with _games as (
             select
                 g.id as game_id,
                 t.id as team_id,
                 t.team_order,
-                t.team || ' - ' || t.grade as team_name,
+                t.team_name,
                 g.round,
                 g.opposition,
                 g.start_ts
@@ -29,9 +19,9 @@ def player_data(season: str, team_round: str, team: str) -> pd.DataFrame:
             inner join teams as t
             on g.team_id = t.id
             where
-                g.season = '{ season }'
-                and g.round = '{ team_round }'
-                and t.team || ' - ' || t.grade = '{ team }'
+                g.season = :season
+                and g.round = :team_round
+                and t.team_name = :team
         ),
 
         _selections as (
@@ -64,7 +54,7 @@ def player_data(season: str, team_round: str, team: str) -> pd.DataFrame:
             on p.id = r.player_id
             cross join _games as g
             where
-                r.season = '{ season }'
+                r.season = :season
         ),
 
         _played_games as (
@@ -105,8 +95,24 @@ def player_data(season: str, team_round: str, team: str) -> pd.DataFrame:
             selected desc,
             goal_keeper desc,
             players_grade desc
-        """
-    )
+        """,
+    tables=("games", "teams", "selections", "players", "registrations", "results"),
+    ttl=300,
+)
+
+
+def player_data(season: str, team_round: str, team: str) -> pd.DataFrame:
+    """Extact the player data for the team and round.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        team_round (str): The teams round of the season.
+        team (str): The team results are being updated for.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    df = read_data(PLAYERS, {"season": season, "team_round": team_round, "team": team})
     return df.astype(
         {
             "selected": bool,
@@ -2,22 +2,13 @@ import datetime as dt
 import streamlit as st
 import pandas as pd
 
-from utils import read_data, calculate_date_interval
+from queries import register_query
+from utils import read_data
+from .week_data import week_window
 
-
-def selections_input_data(season: str, team_round: str, team: str) -> pd.DataFrame:
-    """Extact the selections data for the team and round.
-
-    Args:
-        season (str): The hockey season, usually the calendar year.
-        team_round (str): The teams round of the season.
-        team (str): The team being selected for.
-
-    Retuns:
-        pd.DataFrame: The results of the query.
+SELECTIONS_INPUT = register_query(
+    "selection.selections_input_data",
     """
-    df = read_data(
-        f"""
         with _games as (
             select
                 g.id as game_id,
@@ -26,9 +17,9 @@ def selections_input_data(season: str, team_round: str, team: str) -> pd.DataFra
             inner join teams as t
             on g.team_id = t.id
             where
-                g.season = '{ season }'
-                and g.round = '{ team_round }'
-                and t.team || ' - ' || t.grade = '{ team }'
+                g.season = :season
+                and g.round = :team_round
+                and t.team_name = :team
         ),
         
         _selections as (
@@ -56,7 +47,7 @@ def selections_input_data(season: str, team_round: str, team: str) -> pd.DataFra
             on p.id = r.player_id
             cross join _games as g
             where
-                r.season = '{ season }'
+                r.season = :season
         )
 
         select
@@ -80,79 +71,60 @@ def selections_input_data(season: str, team_round: str, team: str) -> pd.DataFra
         order by
             s.selected desc,
             s.goal_keeper desc
-        """
+        """,
+    tables=("games", "teams", "selections", "players", "registrations"),
+    ttl=300,
+)
+
+
+def selections_input_data(season: str, team_round: str, team: str) -> pd.DataFrame:
+    """Extact the selections data for the team and round.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        team_round (str): The teams round of the season.
+        team (str): The team being selected for.
+
+    Retuns:
+        pd.DataFrame: The results of the query.
+    """
+    df = read_data(
+        SELECTIONS_INPUT, {"season": season, "team_round": team_round, "team": team}
     )
     if not df.shape[0]:
         return pd.DataFrame()
     return df
 
 
-def selections_output_data(
-    season: str, date_end: dt.datetime, date_inteval: int = 6
-) -> pd.DataFrame:
+def selections_output_data(season: str, date_end: dt.datetime) -> pd.DataFrame:
     """Extact the selections made for the week.
 
     Args:
         season (str): The hockey season, usually the calendar year.
         date_end (dt.datetime): The end timestamp.
-        date_inteval (int, optional): How many days before the date_end to include. Defualts to 6.
 
     Retuns:
         pd.DataFrame: The results of the query.
     """
-    date_start, date_end = calculate_date_interval(date_end, date_inteval)
-    df = read_data(
-        f"""
-        with _games as (
-            select
-                g.id as game_id,
-                t.id as team_id,
-                t.team_order,
-                t.team || ' - ' || t.grade as team_name,
-                g.round,
-                g.opposition,
-                g.start_ts,
-                t.manager,
-                t.manager_mobile,
-                l.name as location,
-                l.field
-            from games as g
-            inner join teams as t
-            on g.team_id = t.id
-            left join locations as l
-            on g.location_id = l.id
-            where
-                g.season = '{ season }'
-                and g.start_ts between '{ date_start }' and '{ date_end }'
-        ),
-
-        _selections as (
-            select
-                s.id as selection_id,
-                g.team_name,
-                p.full_name as players_name,
-                s.goal_keeper,
-                g.round,
-                g.opposition,
-                g.start_ts,
-                g.team_order,
-                g.manager,
-                g.manager_mobile,
-                g.location,
-                g.field
-            from _games as g
-            left join selections as s
-            on s.game_id = g.game_id
-            left join players as p
-            on s.player_id = p.id
-            where s.selected = True
-        )
-
-        select *
-        from _selections
-        order by team_order
-        """
-    )
+    window = week_window(season, date_end)
+    df = window.selected_players.merge(
+        window.games[
+            [
+                "game_id",
+                "team_name",
+                "round",
+                "opposition",
+                "start_ts",
+                "game_time",
+                "team_order",
+                "manager",
+                "manager_mobile",
+                "location",
+                "field",
+            ]
+        ],
+        on="game_id",
+    ).sort_values("team_order")
     ### validation ###
     if not df.shape[0]:
         st.error(
@@ -162,7 +134,4 @@ def selections_output_data(
             """
         )
         return pd.DataFrame()
-    df.loc[:, "game_time"] = pd.to_datetime(df.loc[:, "start_ts"]).dt.strftime(
-        "%a %d %B, %-I:%M %p"
-    )
     return df
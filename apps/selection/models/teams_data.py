@@ -1,13 +1,25 @@
 import pandas as pd
 
+from queries import register_query
 from utils import read_data
 
+TEAMS = register_query(
+    "selection.team_data",
+    """select team, grade from teams where season = :season""",
+    tables=("teams",),
+    ttl=600,
+)
+TEAM_ID = register_query(
+    "selection.team_id_data",
+    """select id from teams where season = :season and team = :team and grade = :grade""",
+    tables=("teams",),
+    ttl=600,
+)
+
 
 def team_data(season: str) -> pd.DataFrame:
-    return read_data(f"""select team, grade from teams where season = '{season}'""")
+    return read_data(TEAMS, {"season": season})
 
 
 def team_id_data(season: str, team: str, grade: str) -> pd.DataFrame:
-    return read_data(
-        f"""select id from teams where season = '{season}' and team = '{team}' and grade = '{grade}'"""
-    )
+    return read_data(TEAM_ID, {"season": season, "team": team, "grade": grade})
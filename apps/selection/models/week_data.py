@@ -0,0 +1,165 @@
+import datetime as dt
+import itertools
+from dataclasses import dataclass
+import streamlit as st
+import pandas as pd
+
+from queries import register_query
+from utils import read_data, calculate_date_interval, table_events
+
+WEEK_GAMES = register_query(
+    "selection.week_games",
+    """
+        with _selections as (
+            select
+                game_id,
+                sum(selected::int) as selected,
+                sum(played::int) as played,
+                nullif(count(*) filter (where selected = true), 0) as players_selected
+            from selections
+            group by
+                game_id
+        )
+
+        select
+            g.create_ts,
+            g.update_ts,
+            g.id as game_id,
+            t.id as team_id,
+            t.team,
+            t.grade,
+            t.team_name,
+            t.team_order,
+            t.manager,
+            t.manager_mobile,
+            g.opposition,
+            g.start_ts,
+            g.round,
+            case
+                when round = 'SF1' then '30'
+                when round = 'PF1' then '40'
+                when round = 'GF1' then '30'
+                else round
+            end as round_order,
+            l.name as location,
+            l.field,
+            s.selected,
+            s.played,
+            s.players_selected,
+            g.goals_for,
+            g.goals_against
+        from games as g
+        inner join teams as t
+        on g.team_id = t.id
+        left join locations as l
+        on g.location_id = l.id
+        left join _selections as s
+        on g.id = s.game_id
+        where
+            g.season = :season
+            and g.start_ts between :date_start and :date_end
+        order by
+            t.team_order
+    """,
+    tables=("games", "teams", "locations", "selections"),
+    ttl=300,
+)
+WEEK_SELECTED_PLAYERS = register_query(
+    "selection.week_selected_players",
+    """
+        select
+            s.id as selection_id,
+            s.game_id,
+            p.full_name as players_name,
+            s.goal_keeper
+        from games as g
+        inner join selections as s
+        on s.game_id = g.id
+        left join players as p
+        on s.player_id = p.id
+        where
+            g.season = :season
+            and g.start_ts between :date_start and :date_end
+            and s.selected = true
+    """,
+    tables=("games", "selections", "players"),
+    ttl=300,
+)
+
+
+# Counts the changes to the tables the week windows are read from, in any session
+# or process. A window loaded before the latest change is reloaded.
+_VERSIONS = itertools.count()
+_version = next(_VERSIONS)
+
+
+def _invalidate(*tables: str) -> None:
+    global _version
+    if "*" in tables or set(tables) & set(
+        WEEK_GAMES.tables + WEEK_SELECTED_PLAYERS.tables
+    ):
+        _version = next(_VERSIONS)
+
+
+table_events.subscribe(_invalidate)
+
+
+@dataclass
+class WeekWindow:
+    """The games of a week, and the players selected for them."""
+
+    games: pd.DataFrame
+    selected_players: pd.DataFrame
+    version: int
+
+
+def week_window(season: str, week_end: dt.date, refresh: bool = False) -> WeekWindow:
+    """The games and selections for the week, loaded once per session and reloaded
+    when the tables they are read from change.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        week_end (dt.date): The last day of the week.
+        refresh (bool, optional): True to reload the week, e.g. after a write.
+
+    Returns:
+        WeekWindow: The week's games and selected players.
+    """
+    table_events.poll()
+    windows = st.session_state.setdefault("week_windows", {})
+    key = (season, str(week_end))
+    window = windows.get(key)
+    if refresh or window is None or window.version != _version:
+        window = _load_week_window(season, week_end)
+        windows[key] = window
+    return window
+
+
+def refresh_week_window(season: str, week_end: dt.date) -> WeekWindow:
+    """Reload the week after its games or selections have been written.
+
+    Args:
+        season (str): The hockey season, usually the calendar year.
+        week_end (dt.date): The last day of the week.
+
+    Returns:
+        WeekWindow: The week's games and selected players.
+    """
+    return week_window(season, week_end, refresh=True)
+
+
+def _load_week_window(season: str, week_end: dt.date) -> WeekWindow:
+    version = _version
+    date_start, date_end = calculate_date_interval(week_end)
+    params = {"season": season, "date_start": date_start, "date_end": date_end}
+    games = read_data(WEEK_GAMES, params).replace("", None)
+    games["start_ts"] = pd.to_datetime(games["start_ts"])
+    games.loc[:, "game_time"] = games.loc[:, "start_ts"].dt.strftime(
+        "%a %d %B, %-I:%M %p"
+    )
+    games.loc[:, "round_order"] = games.loc[:, "round_order"].astype(int)
+    return WeekWindow(
+        games=games,
+        selected_players=read_data(WEEK_SELECTED_PLAYERS, params),
+        version=version,
+    )
@@ -5,11 +5,16 @@ import pandas as pd
 from utils import (
     auth_validation,
     add_timestamp,
+    bulk_insert,
+    bulk_update,
     compare_dataframes,
-    create_data,
-    update_data,
 )
-from selection.models import last_game_date, game_data, player_data
+from selection.models import (
+    latest_round,
+    game_data,
+    player_data,
+    refresh_week_window,
+)
 
 
 @auth_validation
@@ -27,12 +32,12 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
     st.subheader("- Add the results, and cards given", divider="green")
 
     # Date end filter
-    max_date = last_game_date(season)
+    latest = latest_round(season)
     col1, _, _ = st.columns(3)
     date_filter = col1.date_input(
         "Games for Week Ending",
         format="DD/MM/YYYY",
-        value=max_date,
+        value=latest.game_date if latest else None,
         min_value=dt.date(year=int(season), month=1, day=1),
         max_value=dt.date(year=int(season), month=12, day=31),
     )
@@ -51,11 +56,17 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
     game_changes = compare_dataframes(game_result, updated_game_results, "game_id")
     if game_changes.shape[0]:
         update_game_results(game_changes, database_lock)
+        refresh_week_window(season, date_filter)
         game_result = game_data(season, date_filter)
 
     ### Filters for player data ###
     col1, col2, _, _ = st.columns(4)
-    team_round = col1.selectbox("Round", game_result["round"].unique().tolist())
+    rounds = game_result["round"].unique().tolist()
+    team_round = col1.selectbox(
+        "Round",
+        rounds,
+        index=rounds.index(latest.round) if latest and latest.round in rounds else 0,
+    )
     team = col2.selectbox("Team", game_result["team_name"].unique().tolist())
 
     ### Validation for player data ###
@@ -147,6 +158,7 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
     create_player_results(create_results, lock=database_lock)
 
     # refresh data
+    refresh_week_window(season, date_filter)
     player_result = player_data(season, team_round, team)
 
 
@@ -209,9 +221,7 @@ def update_game_results(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data("games", "goals_for", row["game_id"], row["goals_for"])
-        update_data("games", "goals_against", row["game_id"], row["goals_against"])
+    bulk_update("games", df, "game_id", ["goals_for", "goals_against"])
 
 
 def input_player_results(df: pd.DataFrame):
@@ -314,11 +324,12 @@ def update_player_results(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data("results", "goals", row["selection_id"], row["goals"])
-        update_data("results", "red_card", row["selection_id"], row["red_card"])
-        update_data("results", "yellow_card", row["selection_id"], row["yellow_card"])
-        update_data("results", "green_card", row["selection_id"], row["green_card"])
+    bulk_update(
+        "results",
+        df,
+        "selection_id",
+        ["goals", "red_card", "yellow_card", "green_card"],
+    )
 
 
 def update_player_selections(df: pd.DataFrame, lock: bool = True) -> None:
@@ -334,11 +345,7 @@ def update_player_selections(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data("selections", "played", row["selection_id"], row["played"])
-        update_data(
-            "selections", "goal_keeper", row["selection_id"], row["goal_keeper"]
-        )
+    bulk_update("selections", df, "selection_id", ["played", "goal_keeper"])
 
 
 def create_player_results(df: pd.DataFrame, lock: bool = True) -> None:
@@ -354,28 +361,13 @@ def create_player_results(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        create_data(
-            "results",
-            (
-                "id",
-                "create_ts",
-                "update_ts",
-                "goals",
-                "red_card",
-                "yellow_card",
-                "green_card",
-            ),
-            (
-                row["selection_id"],
-                str(add_timestamp()),
-                str(add_timestamp()),
-                row["goals"],
-                row["red_card"],
-                row["yellow_card"],
-                row["green_card"],
-            ),
-        )
+    timestamp = str(add_timestamp())
+    bulk_insert(
+        "results",
+        df[["selection_id", "goals", "red_card", "yellow_card", "green_card"]]
+        .rename(columns={"selection_id": "id"})
+        .assign(create_ts=timestamp, update_ts=timestamp),
+    )
 
 
 def create_player_selections(df: pd.DataFrame, lock: bool = True) -> None:
@@ -391,30 +383,22 @@ def create_player_selections(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        create_data(
-            "selections",
-            (
-                "id",
-                "create_ts",
-                "update_ts",
+    timestamp = str(add_timestamp())
+    bulk_insert(
+        "selections",
+        df[
+            [
+                "selection_id",
                 "game_id",
                 "player_id",
                 "goal_keeper",
                 "selected",
                 "played",
-            ),
-            (
-                row["selection_id"],
-                str(add_timestamp()),
-                str(add_timestamp()),
-                row["game_id"],
-                row["player_id"],
-                row["goal_keeper"],
-                row["selected"],
-                row["played"],
-            ),
-        )
+            ]
+        ]
+        .rename(columns={"selection_id": "id"})
+        .assign(create_ts=timestamp, update_ts=timestamp),
+    )
 
 
 main()
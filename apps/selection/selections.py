@@ -8,13 +8,13 @@ from utils import (
     auth_validation,
     add_timestamp,
     calculate_date_interval,
+    bulk_insert,
+    bulk_update,
     compare_dataframes,
-    create_data,
-    update_data,
 )
 from selection.models import (
-    game_data,
-    last_game_date,
+    refresh_week_window,
+    latest_round,
     selections_input_data,
     selections_output_data,
     game_selection_data,
@@ -35,12 +35,12 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
     st.subheader("Select players to play each game.", divider="green")
 
     # Date end filter
-    max_date = last_game_date(season)
+    latest = latest_round(season)
     col1, _, _ = st.columns(3)
     date_filter = col1.date_input(
         "Games for Week Ending",
         format="DD/MM/YYYY",
-        value=max_date,
+        value=latest.game_date if latest else None,
         min_value=dt.date(year=int(season), month=1, day=1),
         max_value=dt.date(year=int(season), month=12, day=31),
     )
@@ -87,7 +87,12 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
 
     ### Filters for player data ###
     col1, col2, _, _ = st.columns(4)
-    team_round = col1.selectbox("Round", game["round"].unique().tolist())
+    rounds = game["round"].unique().tolist()
+    team_round = col1.selectbox(
+        "Round",
+        rounds,
+        index=rounds.index(latest.round) if latest and latest.round in rounds else 0,
+    )
     team = col2.selectbox("Team", game["team_name"].unique().tolist())
 
     ### Validation for player data ###
@@ -123,7 +128,7 @@ def main(database_lock: bool = False, season: str = "2024") -> None:
     create_selection(creates, lock=database_lock)
 
     # refresh data
-    game = game_data(season, date_filter)
+    refresh_week_window(season, date_filter)
     selections = selections_input_data(season, team_round, team)
 
 
@@ -309,11 +314,7 @@ def update_selection(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        update_data(
-            "selections", "goal_keeper", row["selection_id"], row["goal_keeper"]
-        )
-        update_data("selections", "selected", row["selection_id"], row["selected"])
+    bulk_update("selections", df, "selection_id", ["goal_keeper", "selected"])
 
 
 def create_selection(df: pd.DataFrame, lock: bool = True) -> None:
@@ -329,28 +330,13 @@ def create_selection(df: pd.DataFrame, lock: bool = True) -> None:
     if lock:
         st.error("Database is locked, contact the administrator.")
         return
-    for _, row in df.iterrows():
-        create_data(
-            "selections",
-            (
-                "id",
-                "create_ts",
-                "update_ts",
-                "game_id",
-                "player_id",
-                "goal_keeper",
-                "selected",
-            ),
-            (
-                row["selection_id"],
-                str(add_timestamp()),
-                str(add_timestamp()),
-                row["game_id"],
-                row["player_id"],
-                row["goal_keeper"],
-                row["selected"],
-            ),
-        )
+    timestamp = str(add_timestamp())
+    bulk_insert(
+        "selections",
+        df[["selection_id", "game_id", "player_id", "goal_keeper", "selected"]]
+        .rename(columns={"selection_id": "id"})
+        .assign(create_ts=timestamp, update_ts=timestamp),
+    )
 
 
 main()
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+import psycopg2
+import psycopg2.extensions
+
+# The Postgres channel table changes are published on, shared with database_scripts.
+TABLE_CHANGED_CHANNEL = "table_changed"
+# Seconds to wait before reconnecting a lost listener, doubling up to the maximum.
+RECONNECT_SECONDS = 1.0
+MAX_RECONNECT_SECONDS = 60.0
+
+
+class TableEvents:
+    """Publish and subscribe to "table changed" events.
+
+    Events published in this process are delivered straight to the subscribers.
+    Writers in other processes, such as the database_scripts loaders, publish with
+    pg_notify on TABLE_CHANGED_CHANNEL; those are picked up by `poll`.
+
+    While the listener is down it is reconnected with a backoff, rather than on
+    every poll, and every table is treated as changed once it is back.
+
+    Args:
+        dsn (Callable[[], str]): Returns the database url, called when the listener
+            connects, so nothing reads the database settings until the first poll.
+    """
+
+    def __init__(self, dsn: Callable[[], str]) -> None:
+        self.dsn = dsn
+        self._subscribers: list[Callable[..., None]] = []
+        self._connection: Optional[psycopg2.extensions.connection] = None
+        self._lock = threading.Lock()
+        self._lost = False
+        self._backoff = RECONNECT_SECONDS
+        self._reconnect_at = 0.0
+
+    def subscribe(self, callback: Callable[..., None]) -> None:
+        """Register a callback to receive the names of the changed tables.
+
+        Args:
+            callback (Callable[..., None]): Called with the changed tables as arguments.
+        """
+        self._subscribers.append(callback)
+
+    def publish(self, *tables: str) -> None:
+        """Tell the subscribers the tables have changed.
+
+        Args:
+            tables (str): The tables that have changed.
+        """
+        for callback in self._subscribers:
+            callback(*tables)
+
+    def poll(self) -> None:
+        """Deliver the table changes notified by other processes since the last poll."""
+        with self._lock:
+            if self._connection is None and time.monotonic() < self._reconnect_at:
+                return
+            try:
+                if self._connection is None:
+                    self._listen()
+                self._connection.poll()
+                tables = {notify.payload for notify in self._connection.notifies}
+                self._connection.notifies.clear()
+            except psycopg2.Error as error:
+                if not self._lost:
+                    logging.warning(f"Lost the table change listener: {error}")
+                self._lost = True
+                self._connection = None
+                self._reconnect_at = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, MAX_RECONNECT_SECONDS)
+                return
+            if self._lost:
+                logging.warning("Reconnected the table change listener")
+                # Notifications were missed while it was down, so treat every
+                # table as changed, once.
+                tables.add("*")
+                self._lost = False
+                self._backoff = RECONNECT_SECONDS
+        if tables:
+            self.publish(*tables)
+
+    def _listen(self) -> None:
+        self._connection = psycopg2.connect(self.dsn())
+        self._connection.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN { TABLE_CHANGED_CHANNEL }")
@@ -1,17 +1,23 @@
 import os
 import string
 import random
+import threading
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 from dataclasses import dataclass
 from urllib.parse import quote_plus
-from typing import Any
+from typing import Any, Optional, Union
 import datetime as dt
 import pandas as pd
-from sqlalchemy import Engine, create_engine, text
+from sqlalchemy import Engine, QueuePool, create_engine, text
 import streamlit as st
 
 from pages import login_page, login_create_login
+from metrics import metrics
+from queries import Query
+from query_cache import QueryCache
+from table_events import TableEvents
 
 
 load_dotenv(dotenv_path=Path(".env"))
@@ -23,6 +29,10 @@ class Database:
     db_name: str
     db_password: str
     db_user: str
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
 
     @property
     def db_url(self) -> str:
@@ -35,12 +45,33 @@ class Database:
 
     @property
     def create_db_engine(self) -> Engine:
-        """Create database engine
+        """The process wide database engine.
+
+        The engine, and its connection pool, is created on first use and shared
+        by every Streamlit session running in this process.
 
         Returns:
             Engine: Database engine.
         """
-        return create_engine(self.db_url)
+        global _ENGINE
+        if _ENGINE is None:
+            with _ENGINE_LOCK:
+                if _ENGINE is None:
+                    _ENGINE = create_engine(
+                        self.db_url,
+                        poolclass=QueuePool,
+                        pool_size=self.pool_size,
+                        max_overflow=self.max_overflow,
+                        pool_pre_ping=self.pool_pre_ping,
+                        pool_recycle=self.pool_recycle,
+                        # Batch executemany UPDATEs into as few round trips as possible.
+                        executemany_mode="values_plus_batch",
+                    )
+        return _ENGINE
+
+
+_ENGINE: Optional[Engine] = None
+_ENGINE_LOCK = threading.Lock()
 
 
 database = Database(
@@ -48,7 +79,35 @@ database = Database(
     db_name=os.getenv("DB_NAME"),
     db_password=os.getenv("DB_PASSWORD"),
     db_user=os.getenv("DB_USER"),
+    pool_size=int(os.getenv("DB_POOL_SIZE", default=5)),
+    max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", default=10)),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", default="true").lower() == "true",
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", default=1800)),
+)
+
+
+query_cache = QueryCache(
+    max_bytes=int(os.getenv("QUERY_CACHE_MAX_MB", default=64)) * 1024 * 1024
 )
+table_events = TableEvents(lambda: database.db_url)
+table_events.subscribe(query_cache.invalidate)
+
+
+def pool_statistics() -> dict[str, int]:
+    """Statistics of the shared connection pool, for monitoring.
+
+    Returns:
+        dict[str, int]: The pool size, and the connections checked in, checked out and in overflow.
+    """
+    if _ENGINE is None:
+        return {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+    pool = _ENGINE.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
 
 
 def auth_validation(func):
@@ -91,20 +150,53 @@ def id_generator(size=6, chars: str = string.ascii_uppercase + string.digits) ->
 
 
 # Function to create a SQLite connection and retrieve data
-def read_data(sql_statement: str) -> pd.DataFrame:
+def read_data(
+    sql_statement: Union[str, Query],
+    params: Optional[dict[str, Any]] = None,
+    ttl: Optional[int] = None,
+    tables: Optional[tuple[str]] = None,
+) -> pd.DataFrame:
     """Help function to read data from the database.
 
     Args:
-        sql_statement (str): The SQL statement to pass to the db.
+        sql_statement (Union[str, Query]): The SQL statement, or registered query, to pass to the db.
+        params (dict[str, Any], optional): The parameters bound to the statement.
+        ttl (int, optional): Seconds to cache the results for. Defaults to the
+            queries ttl, or not caching.
+        tables (tuple[str], optional): The tables the cached results depend on.
+            Defaults to the queries tables, or the tables named in the SQL statement.
 
     Returns:
         pd.DataFrame: A pandas dataframe containing the results.
     """
-    try:
-        with database.create_db_engine.connect() as session:
-            return pd.read_sql_query(sql_statement, session)
-    finally:
-        session.close()
+    name = None
+    if isinstance(sql_statement, Query):
+        name = sql_statement.name
+        ttl = ttl or sql_statement.ttl
+        tables = tables or sql_statement.tables
+        sql_statement = sql_statement.sql
+    if ttl:
+        table_events.poll()
+        key = query_cache.key(sql_statement, params)
+        df = query_cache.get(key)
+        if df is not None:
+            metrics.record(
+                name or _statement_name(sql_statement), 0.0, df.shape[0], cached=True
+            )
+            return df
+    start = time.perf_counter()
+    with database.create_db_engine.connect() as session:
+        acquired = time.perf_counter()
+        df = pd.read_sql_query(text(sql_statement), session, params=params)
+    metrics.record(
+        name or _statement_name(sql_statement),
+        time.perf_counter() - start,
+        df.shape[0],
+        acquired - start,
+    )
+    if ttl:
+        query_cache.set(key, df, ttl, frozenset(tables) if tables else None)
+    return df
 
 
 def create_data(
@@ -131,12 +223,21 @@ def create_data(
         )
         return
     try:
+        start = time.perf_counter()
         with database.create_db_engine.connect() as session:
+            acquired = time.perf_counter()
             # Update a record
             sql = f"""INSERT INTO { table } ({', '.join(columns) }) VALUES { values }"""
-            session.execute(text(sql))
+            result = session.execute(text(sql))
             # Commit changes
             session.commit()
+        metrics.record(
+            f"{ table }.create_data",
+            time.perf_counter() - start,
+            result.rowcount,
+            acquired - start,
+        )
+        table_events.publish(table)
         if verbose:
             st.write(sql)
             st.write(f"Record created successfully to { columns } = { values }")
@@ -176,11 +277,20 @@ def update_data(
         sql = f"""UPDATE { table } SET { column } = { value }, update_ts = '{ add_timestamp() }' WHERE id = '{ row_id }'"""
         if value_string_type:
             sql = f"""UPDATE { table } SET { column } = '{ value }', update_ts = '{ add_timestamp() }' WHERE id = '{ row_id }'"""
+        start = time.perf_counter()
         with database.create_db_engine.connect() as session:
+            acquired = time.perf_counter()
             # Update a record
-            session.execute(text(sql))
+            result = session.execute(text(sql))
             # Commit changes
             session.commit()
+        metrics.record(
+            f"{ table }.update_data",
+            time.perf_counter() - start,
+            result.rowcount,
+            acquired - start,
+        )
+        table_events.publish(table)
         if verbose:
             st.write(sql)
             st.write(
@@ -190,6 +300,135 @@ def update_data(
         session.close()
 
 
+def bulk_update(
+    table: str,
+    df: pd.DataFrame,
+    key: str,
+    columns: list[str],
+    database_lock: bool = False,
+    verbose: bool = False,
+) -> None:
+    """Helper function to update many rows of data in the database in one transaction.
+
+    Args:
+        table (str): The table to update.
+        df (pd.DataFrame): The rows to update.
+        key (str): The dataframe column holding the id of the record to update.
+        columns (list[str]): The columns to update, named the same in the dataframe and table.
+        database_lock (bool, optional): If the database has been locked.
+        verbose (bool, optional): True to print the queries written to the database.
+
+    Returns: None
+    """
+    if database_lock and table != "users":
+        st.error(
+            "A hard lock has been applied to the databases. Contact the administrator."
+        )
+        return
+    if not df.shape[0]:
+        return
+    set_columns = ", ".join(f"{ column } = :{ column }" for column in columns)
+    sql = f"""UPDATE { table } SET { set_columns }, update_ts = :update_ts WHERE id = :id"""
+    records = _records(
+        df[columns].assign(id=df[key].values, update_ts=str(add_timestamp()))
+    )
+    start = time.perf_counter()
+    with database.create_db_engine.begin() as session:
+        acquired = time.perf_counter()
+        result = session.execute(text(sql), records)
+    metrics.record(
+        f"{ table }.bulk_update",
+        time.perf_counter() - start,
+        _rows_affected(result.rowcount, records),
+        acquired - start,
+    )
+    table_events.publish(table)
+    if verbose:
+        st.write(sql)
+        st.write(f"{ len(records) } records updated successfully in { table }")
+
+
+def bulk_insert(
+    table: str,
+    df: pd.DataFrame,
+    database_lock: bool = False,
+    verbose: bool = False,
+) -> None:
+    """Helper function to write many rows of data to the database in one transaction.
+
+    Args:
+        table (str): The table to write to.
+        df (pd.DataFrame): The rows to write, the dataframe columns are the table columns.
+        database_lock (bool, optional): If the database has been locked.
+        verbose (bool, optional): True to print the queries written to the database.
+
+    Returns: None
+    """
+    if database_lock:
+        st.error(
+            "A hard lock has been applied to the databases. Contact the administrator."
+        )
+        return
+    if not df.shape[0]:
+        return
+    columns = df.columns.tolist()
+    sql = f"""INSERT INTO { table } ({ ', '.join(columns) }) VALUES ({ ', '.join(f':{ column }' for column in columns) })"""
+    records = _records(df)
+    start = time.perf_counter()
+    with database.create_db_engine.begin() as session:
+        acquired = time.perf_counter()
+        result = session.execute(text(sql), records)
+    metrics.record(
+        f"{ table }.bulk_insert",
+        time.perf_counter() - start,
+        _rows_affected(result.rowcount, records),
+        acquired - start,
+    )
+    table_events.publish(table)
+    if verbose:
+        st.write(sql)
+        st.write(f"{ len(records) } records created successfully in { table }")
+
+
+def _statement_name(sql_statement: str) -> str:
+    """Name an unregistered statement by its text, on one line and shortened.
+
+    Args:
+        sql_statement (str): The SQL statement.
+
+    Returns:
+        str: The name the statement's metrics are recorded under.
+    """
+    statement = " ".join(sql_statement.split())
+    return statement if len(statement) <= 80 else statement[:77] + "..."
+
+
+def _rows_affected(rowcount: int, records: list[dict[str, Any]]) -> int:
+    """The rows a batched statement affected, the records written if the driver doesn't say.
+
+    Args:
+        rowcount (int): The rowcount of the result, -1 if unknown.
+        records (list[dict[str, Any]]): The records written.
+
+    Returns:
+        int: The rows affected.
+    """
+    return rowcount if rowcount >= 0 else len(records)
+
+
+def _records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """Convert a dataframe to bind parameters, with python types and nulls as None.
+
+    Args:
+        df (pd.DataFrame): The dataframe to convert.
+
+    Returns:
+        list[dict[str, Any]]: One dictionary per row.
+    """
+    _df = df.astype(object)
+    return _df.where(_df.notna(), None).to_dict("records")
+
+
 def add_timestamp() -> pd.to_datetime:
     """Calculates the current timestamp in isoformat.
 
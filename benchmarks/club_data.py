@@ -0,0 +1,344 @@
+"""Generate a synthetic hockey club, and load it into its own Postgres database.
+
+The club has a team per grade, every player registered each season, a game per team
+and round, selections and results for the games played and an invoice per
+registration. The model queries are Postgres only, so there is no SQLite stand-in.
+"""
+
+import datetime as dt
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote_plus
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from database_scripts.ingest import copy_merge  # noqa: E402
+from database_scripts.migrations import apply_migrations  # noqa: E402
+from database_scripts.schema import apply_schema  # noqa: E402
+
+# The tables the apps read and write, as they are in production. The scores are
+# text, as the loaders write them, with "" for the games not yet played.
+BASE_SCHEMA = [
+    """
+    CREATE TABLE teams (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, season text,
+        grade text, team text, manager text, manager_mobile text, team_order integer
+    )
+    """,
+    """
+    CREATE TABLE locations (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, name text,
+        field text, address text, lat double precision, long double precision
+    )
+    """,
+    """
+    CREATE TABLE players (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, full_name text
+    )
+    """,
+    """
+    CREATE TABLE registrations (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, season text,
+        player_id text, team text, grade text, team_id text, registered_date timestamp
+    )
+    """,
+    """
+    CREATE TABLE games (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, season text,
+        team_id text, location_id text, round text, finals boolean, opposition text,
+        start_ts timestamp, goals_for text, goals_against text
+    )
+    """,
+    """
+    CREATE TABLE selections (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, game_id text,
+        player_id text, goal_keeper boolean, selected boolean, played boolean
+    )
+    """,
+    """
+    CREATE TABLE results (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, goals integer,
+        green_card integer, yellow_card integer, red_card integer
+    )
+    """,
+    """
+    CREATE TABLE invoices (
+        id text PRIMARY KEY, player_id text, registration_id text, status text,
+        issued_date date, due_date date, amount numeric, discount numeric,
+        amount_credited numeric, amount_paid numeric, on_payment_plan boolean,
+        invoice_sent boolean, discount_applied boolean, fully_paid_date date,
+        lines jsonb
+    )
+    """,
+    """
+    CREATE TABLE users (
+        id text PRIMARY KEY, create_ts timestamp, update_ts timestamp, name text,
+        username text, email text, hashed_password text, role text
+    )
+    """,
+]
+# The database the apps use, never dropped, read before the benchmarks repoint DB_NAME.
+APPS_DB_NAME = os.getenv("DB_NAME", default="").partition("?")[0]
+GRADES = ["PL", "PLR", "1st", "2nd", "3rd", "4th", "5th", "6th", "Masters", "Womens"]
+OPPOSITION = ["Norths", "Souths", "Easts", "Port", "Gosford", "Maitland", "Tigers"]
+LOCATIONS = ["Newcastle International Hockey Centre", "Maitland Park", "Central Coast"]
+
+
+@dataclass(frozen=True)
+class ClubSize:
+    """How big the synthetic club is.
+
+    seasons: Seasons of data, ending with the current year.
+    grades: Grades entered, one team each.
+    players: Players registered each season.
+    rounds: Rounds in a season, one game per team each.
+    players_per_game: Players selected for each game, one of them the keeper.
+    """
+
+    seasons: int = 3
+    grades: int = 10
+    players: int = 400
+    rounds: int = 18
+    players_per_game: int = 13
+
+    @property
+    def first_season(self) -> int:
+        return dt.date.today().year - self.seasons + 1
+
+
+def generate(size: ClubSize, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """The rows of every table, in the order they are loaded."""
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now().floor("s")
+    seasons = [str(size.first_season + season) for season in range(size.seasons)]
+    grades = (GRADES * (size.grades // len(GRADES) + 1))[: size.grades]
+    grades = [f"{grade}{i // len(GRADES) or ''}" for i, grade in enumerate(grades)]
+
+    teams = pd.DataFrame(
+        [
+            {
+                "id": f"{season}{grade}West",
+                "season": season,
+                "grade": grade,
+                "team": "West",
+                "manager": f"Manager {order}",
+                "manager_mobile": f"04{order:08}",
+                "team_order": order,
+            }
+            for season in seasons
+            for order, grade in enumerate(grades, start=1)
+        ]
+    )
+    locations = pd.DataFrame(
+        [
+            {
+                "id": f"L{i}{field}",
+                "name": name,
+                "field": f"Field {field}",
+                "address": f"{i} Hockey Road",
+                "lat": -32.9 + i / 100,
+                "long": 151.7 + i / 100,
+            }
+            for i, name in enumerate(LOCATIONS)
+            for field in (1, 2)
+        ]
+    )
+    players = pd.DataFrame(
+        {
+            "id": [f"P{player:05}" for player in range(size.players)],
+            "full_name": [f"Player {player:05}" for player in range(size.players)],
+        }
+    )
+    registrations = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "id": season + players["id"],
+                    "season": season,
+                    "player_id": players["id"],
+                    "team": "West",
+                    "grade": [grades[i % len(grades)] for i in range(size.players)],
+                    "registered_date": pd.Timestamp(f"{season}-01-01")
+                    + pd.to_timedelta(rng.integers(0, 120, size.players), unit="D"),
+                }
+            )
+            for season in seasons
+        ],
+        ignore_index=True,
+    )
+    registrations["team_id"] = (
+        registrations["season"] + registrations["grade"] + registrations["team"]
+    )
+
+    games = teams[["id", "season", "grade", "team_order"]].merge(
+        pd.DataFrame({"round": range(1, size.rounds + 1)}), how="cross"
+    )
+    games["start_ts"] = (
+        pd.to_datetime(games["season"] + "-04-06")
+        + pd.to_timedelta(games["round"] - 1, unit="W")
+        + pd.to_timedelta(8 + games["team_order"] % 10, unit="h")
+    )
+    played = games["start_ts"] < now
+    games = pd.DataFrame(
+        {
+            "id": games["id"] + "R" + games["round"].astype(str),
+            "season": games["season"],
+            "team_id": games["id"],
+            "location_id": rng.choice(locations["id"], games.shape[0]),
+            "round": games["round"].astype(str),
+            "finals": False,
+            "opposition": rng.choice(OPPOSITION, games.shape[0]),
+            "start_ts": games["start_ts"],
+            "goals_for": np.where(
+                played, rng.integers(0, 6, games.shape[0]).astype(str), ""
+            ),
+            "goals_against": np.where(
+                played, rng.integers(0, 6, games.shape[0]).astype(str), ""
+            ),
+        }
+    )
+
+    squads = registrations.groupby("team_id")["player_id"].apply(list).to_dict()
+    selections = []
+    for game_id, team_id, start_ts in zip(
+        games["id"], games["team_id"], games["start_ts"]
+    ):
+        squad = squads.get(team_id, [])
+        chosen = rng.choice(
+            squad, min(size.players_per_game, len(squad)), replace=False
+        )
+        selections += [
+            {
+                "id": game_id + player_id,
+                "game_id": game_id,
+                "player_id": player_id,
+                "goal_keeper": i == 0,
+                "selected": True,
+                "played": start_ts < now,
+            }
+            for i, player_id in enumerate(chosen)
+        ]
+    selections = pd.DataFrame(selections)
+    played_selections = selections.loc[selections["played"], "id"]
+    results = pd.DataFrame(
+        {
+            "id": played_selections,
+            "goals": rng.poisson(0.3, played_selections.shape[0]),
+            "green_card": rng.binomial(1, 0.05, played_selections.shape[0]),
+            "yellow_card": rng.binomial(1, 0.02, played_selections.shape[0]),
+            "red_card": rng.binomial(1, 0.002, played_selections.shape[0]),
+        }
+    )
+
+    status = rng.choice(
+        ["PAID", "AUTHORISED", "VOIDED"], registrations.shape[0], p=[0.7, 0.25, 0.05]
+    )
+    amount = 400.0
+    discount = rng.choice([0.0, 50.0], registrations.shape[0])
+    issued_date = registrations["registered_date"].dt.date
+    invoices = pd.DataFrame(
+        {
+            "id": "I" + registrations["id"],
+            "player_id": registrations["player_id"],
+            "registration_id": registrations["id"],
+            "status": status,
+            "issued_date": issued_date,
+            "due_date": issued_date + dt.timedelta(days=30),
+            "amount": amount,
+            "discount": discount,
+            "amount_credited": 0.0,
+            "amount_paid": np.where(status == "PAID", amount - discount, 0.0),
+            "on_payment_plan": rng.random(registrations.shape[0]) < 0.1,
+            "invoice_sent": True,
+            "discount_applied": discount > 0,
+            "fully_paid_date": np.where(
+                status == "PAID", issued_date + dt.timedelta(days=20), None
+            ),
+            "lines": json.dumps([{"Description": "Senior player fees"}]),
+        }
+    )
+    users = pd.DataFrame(
+        {
+            "id": [f"U{user}" for user in range(5)],
+            "name": [f"User {user}" for user in range(5)],
+            "username": [f"user{user}@club.test" for user in range(5)],
+            "email": [f"user{user}@club.test" for user in range(5)],
+            "hashed_password": None,
+            "role": "admin",
+        }
+    )
+    tables = {
+        "teams": teams,
+        "locations": locations,
+        "players": players,
+        "registrations": registrations,
+        "games": games,
+        "selections": selections,
+        "results": results,
+        "invoices": invoices,
+        "users": users,
+    }
+    for table, df in tables.items():
+        if table != "invoices":
+            df["create_ts"] = now
+            df["update_ts"] = now
+    return tables
+
+
+def server_url(database: str) -> str:
+    """The url of the database on the server configured by the DB_ variables.
+
+    DB_NAME may carry connection options after a "?", they are kept.
+    """
+    options = os.getenv("DB_NAME", "").partition("?")[2]
+    return (
+        f"postgresql://{os.getenv('DB_USER')}:{quote_plus(os.getenv('DB_PASSWORD', ''))}"
+        f"@{os.getenv('DB_HOST')}/{database}" + (f"?{options}" if options else "")
+    )
+
+
+def create_database(name: str) -> Engine:
+    """Drop and create the benchmark database."""
+    drop_database(name)
+    _on_server(f'CREATE DATABASE "{name}"')
+    return create_engine(server_url(name))
+
+
+def drop_database(name: str) -> None:
+    """Drop the benchmark database, never the one the apps use."""
+    if name == APPS_DB_NAME:
+        raise ValueError(f"{name} is the apps' database, choose another name.")
+    _on_server(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+
+def _on_server(statement: str) -> None:
+    server = create_engine(server_url("postgres"), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.execute(text(statement))
+    server.dispose()
+
+
+def load(engine: Engine, tables: dict[str, pd.DataFrame]) -> None:
+    """Create the tables and load the rows, then migrate and build the derived tables.
+
+    The triggers are created after the load, so the derived tables are built once
+    by the backfill rather than row by row.
+    """
+    with Session(engine) as session:
+        for statement in BASE_SCHEMA:
+            session.execute(text(statement))
+        session.commit()
+        for table, df in tables.items():
+            copy_merge(session, table, df.columns.tolist(), df)
+        apply_migrations(session)
+        apply_schema(session)
+        session.execute(text("ANALYZE"))
+        session.commit()
@@ -0,0 +1,271 @@
+"""Time every model function, and the write helpers, against a synthetic club.
+
+The club is generated into its own database, BENCHMARK_DB_NAME (hockey_benchmark),
+on the server the DB_ variables point at, and dropped afterwards. Run from the
+repository root:
+
+    python benchmarks/models.py [--players 400] [--output report.json]
+    python benchmarks/models.py --compare before.json --output after.json
+
+Each model function is timed cold, with the query cache cleared, and warm, served
+from the cache. The report is json, so runs on different commits can be compared.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+import pandas as pd
+from sqlalchemy import text
+
+from club_data import ClubSize, create_database, drop_database, generate, load
+
+APPS_PATH = Path(__file__).resolve().parents[1] / "apps"
+BENCHMARK_DB_NAME = os.getenv("BENCHMARK_DB_NAME", default="hockey_benchmark")
+# Rows written by each call to the bulk write helpers.
+WRITE_ROWS = 100
+
+
+@dataclass(slots=True)
+class Timing:
+    cold_ms: float
+    warm_ms: float
+    rows: int
+
+
+def model_benchmarks(season: str, club: dict[str, pd.DataFrame]) -> dict[str, Callable]:
+    """The model functions of each app, with arguments from the synthetic club."""
+    import finance.models as finance
+    import registration.models as registration
+    import result.models as result
+    import selection.models as selection
+
+    games = club["games"]
+    game = games[(games["season"] == season) & (games["goals_for"] != "")].iloc[-1]
+    team = club["teams"].set_index("id").loc[game["team_id"]]
+    team_name = f"{team['team']} - {team['grade']}"
+    week_end = game["start_ts"].date()
+    player_id = club["registrations"].iloc[0]["player_id"]
+    return {
+        "selection.game_data": lambda: selection.game_data(season),
+        "selection.game_data.week": lambda: selection.game_data(season, week_end),
+        "selection.game_selection_data": lambda: selection.game_selection_data(
+            season, week_end
+        ),
+        "selection.latest_round": lambda: selection.latest_round(season),
+        "selection.team_data": lambda: selection.team_data(season),
+        "selection.team_id_data": lambda: selection.team_id_data(
+            season, team["team"], team["grade"]
+        ),
+        "selection.location_name_data": selection.location_name_data,
+        "selection.location_id_data": lambda: selection.location_id_data(
+            club["locations"].iloc[0]["name"], club["locations"].iloc[0]["field"]
+        ),
+        "selection.field_name_data": selection.field_name_data,
+        "selection.player_data": lambda: selection.player_data(
+            season, game["round"], team_name
+        ),
+        "selection.selections_input_data": lambda: selection.selections_input_data(
+            season, game["round"], team_name
+        ),
+        "selection.selections_output_data": lambda: selection.selections_output_data(
+            season, week_end
+        ),
+        "result.team_results_data": lambda: result.team_results_data(season),
+        "result.team_names": lambda: result.team_names(season),
+        "result.player_data": lambda: result.player_data(player_id, season),
+        "result.player_names": lambda: result.player_names(season),
+        "result.game_rounds": result.game_rounds,
+        "result.game_results_data": lambda: result.game_results_data(season),
+        "result.game_results_page": lambda: result.game_results_page(season),
+        "result.leaderboard_data": lambda: result.leaderboard_data(season),
+        "result.top_scorers": lambda: result.top_scorers(season),
+        "result.most_carded": lambda: result.most_carded(season),
+        "result.club_goals_rank": lambda: result.club_goals_rank(season, player_id),
+        "registration.team_data": lambda: registration.team_data(season),
+        "registration.player_data": lambda: registration.player_data(season),
+        "registration.registration_count": registration.registration_count,
+        "registration.registration_dates": registration.registration_dates,
+        "finance.invoice_data": finance.invoice_data,
+        "finance.largest_over_due_debitors": finance.largest_over_due_debitors,
+        "finance.invoice_overview_data": finance.invoice_overview_data,
+        "finance.collected_fees_data": lambda: finance.collected_fees_data(season),
+    }
+
+
+def write_benchmarks(season: str, club: dict[str, pd.DataFrame]) -> dict[str, Callable]:
+    """The write helpers, each writing rows of the synthetic club back unchanged."""
+    import utils
+
+    selections = club["selections"]
+    selections = selections[selections["game_id"].str.startswith(season)]
+    rows = selections.head(WRITE_ROWS)[["id", "selected", "played"]]
+    results = club["results"].head(WRITE_ROWS)
+    result = results.iloc[0]
+
+    def bulk_insert():
+        with utils.database.create_db_engine.begin() as session:
+            session.execute(
+                text("DELETE FROM results WHERE id = any(:ids)"),
+                {"ids": results["id"].tolist()},
+            )
+        utils.bulk_insert("results", results)
+
+    def create_data():
+        with utils.database.create_db_engine.begin() as session:
+            session.execute(
+                text("DELETE FROM results WHERE id = :id"), {"id": result["id"]}
+            )
+        utils.create_data(
+            "results",
+            ("id", "goals", "green_card", "yellow_card", "red_card"),
+            tuple(
+                result[
+                    ["id", "goals", "green_card", "yellow_card", "red_card"]
+                ].tolist()
+            ),
+        )
+
+    return {
+        "utils.bulk_update": lambda: utils.bulk_update(
+            "selections", rows, "id", ["selected", "played"]
+        ),
+        "utils.update_data": lambda: utils.update_data(
+            "selections", "played", rows.iloc[0]["id"], rows.iloc[0]["played"]
+        ),
+        "utils.bulk_insert": bulk_insert,
+        "utils.create_data": create_data,
+    }
+
+
+def time_call(call: Callable[[], Any], repeat: int, cached: bool = True) -> Timing:
+    """The fastest of the repeats, cold and then warm."""
+    import streamlit as st
+    import utils
+
+    def run(clear: bool) -> tuple[float, Any]:
+        if clear:
+            utils.query_cache.clear()
+            st.session_state.pop("week_windows", None)
+        start = time.perf_counter()
+        value = call()
+        return time.perf_counter() - start, value
+
+    cold = [run(clear=True) for _ in range(repeat)]
+    warm = [run(clear=False) for _ in range(repeat)] if cached else cold
+    value = cold[-1][1]
+    return Timing(
+        cold_ms=min(seconds for seconds, _ in cold) * 1000,
+        warm_ms=min(seconds for seconds, _ in warm) * 1000,
+        rows=len(value) if hasattr(value, "__len__") else int(value is not None),
+    )
+
+
+def compare(before: dict[str, Any], after: dict[str, Any]) -> None:
+    """Print the change in the cold timings between two reports."""
+    if before["size"] != after["size"]:
+        print(f"The club sizes differ, {before['size']} and {after['size']}")
+    print(f"{'':<40} {before['commit'][:8]:>10} {after['commit'][:8]:>10}")
+    for name, timing in after["benchmarks"].items():
+        previous = before["benchmarks"].get(name)
+        if not previous:
+            print(f"{name:<40} {'':>10} {timing['cold_ms']:9.1f}ms")
+            continue
+        change = (
+            timing["cold_ms"] / previous["cold_ms"] - 1 if previous["cold_ms"] else 0
+        )
+        print(
+            f"{name:<40} {previous['cold_ms']:9.1f}ms {timing['cold_ms']:9.1f}ms"
+            f" {change:+7.1%}"
+        )
+
+
+def _commit() -> tuple[str, bool]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=APPS_PATH
+        ).stdout.strip()
+
+    return git("rev-parse", "HEAD"), bool(git("status", "--porcelain"))
+
+
+def main() -> None:
+    defaults = ClubSize()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=defaults.seasons)
+    parser.add_argument("--grades", type=int, default=defaults.grades)
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--rounds", type=int, default=defaults.rounds)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the json report to this file.")
+    parser.add_argument("--compare", help="A previous json report to compare to.")
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the benchmark database."
+    )
+    args = parser.parse_args()
+    size = ClubSize(
+        seasons=args.seasons,
+        grades=args.grades,
+        players=args.players,
+        rounds=args.rounds,
+    )
+
+    start = time.perf_counter()
+    club = generate(size)
+    engine = create_database(BENCHMARK_DB_NAME)
+    try:
+        load(engine, club)
+        load_seconds = time.perf_counter() - start
+        print(
+            f"Loaded {sum(df.shape[0] for df in club.values())} rows"
+            f" into {BENCHMARK_DB_NAME} in {load_seconds:.1f}s"
+        )
+        timings = _run_benchmarks(size, club, args.repeat)
+    finally:
+        engine.dispose()
+        if not args.keep:
+            drop_database(BENCHMARK_DB_NAME)
+
+    commit, dirty = _commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "size": asdict(size),
+        "load_seconds": load_seconds,
+        "benchmarks": {name: asdict(timing) for name, timing in timings.items()},
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
+
+
+def _run_benchmarks(
+    size: ClubSize, club: dict[str, pd.DataFrame], repeat: int
+) -> dict[str, Timing]:
+    # The apps read their database from the environment when first imported.
+    options = os.getenv("DB_NAME", "").partition("?")[2]
+    os.environ["DB_NAME"] = BENCHMARK_DB_NAME + (f"?{options}" if options else "")
+    sys.path.insert(0, str(APPS_PATH))
+    season = str(size.first_season + size.seasons - 1)
+    timings = {}
+    for name, call in model_benchmarks(season, club).items():
+        timings[name] = time_call(call, repeat)
+        print(
+            f"{name:<40} {timings[name].cold_ms:9.1f}ms {timings[name].warm_ms:9.1f}ms"
+        )
+    for name, call in write_benchmarks(season, club).items():
+        timings[name] = time_call(call, repeat, cached=False)
+        print(f"{name:<40} {timings[name].cold_ms:9.1f}ms")
+    return timings
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time building the result page records from a full season of games, all grades.
+
+Run from the repository root:
+
+    python benchmarks/record_construction.py
+"""
+
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps"))
+
+from result.records import records_from_frame  # noqa: E402
+
+GRADES = ["PL", "PLR", "1st", "2nd", "3rd", "4th", "5th", "6th", "Masters", "Womens"]
+ROUNDS = 22
+REPEAT = 20
+
+
+@dataclass(slots=True)
+class Game:
+    """The fields of result.game_results.Game, the page runs on import."""
+
+    round: str
+    grade: str
+    location: str
+    field: str
+    start_time: pd.Timestamp
+    team: str
+    opposition_team: str
+    goals_for: int
+    goals_against: int
+
+
+def season_results(seasons: int = 1) -> pd.DataFrame:
+    """A result set shaped like game_results_data, for every grade and round."""
+    rows = len(GRADES) * ROUNDS * seasons
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "round": np.tile(np.arange(1, ROUNDS + 1), len(GRADES) * seasons).astype(
+                str
+            ),
+            "grade": np.repeat(GRADES, ROUNDS * seasons),
+            "location_name": "NIHC",
+            "field": "Field 1",
+            "start_ts": pd.Timestamp("2024-04-06 10:00")
+            + pd.to_timedelta(np.arange(rows) % ROUNDS, unit="W"),
+            "team": "West",
+            "opposition": "Norths",
+            "goals_for": rng.integers(0, 6, rows).astype(float),
+            "goals_against": rng.integers(0, 6, rows).astype(float),
+        }
+    )
+
+
+def with_iterrows(df: pd.DataFrame) -> list[Game]:
+    games = []
+    for _, game in df.iterrows():
+        games += [
+            Game(
+                round=str(game["round"]),
+                grade=game["grade"],
+                location=game["location_name"],
+                field=game["field"],
+                start_time=game["start_ts"],
+                team=game["team"],
+                opposition_team=game["opposition"],
+                goals_for=int(game["goals_for"]),
+                goals_against=int(game["goals_against"]),
+            )
+        ]
+    return games
+
+
+def with_records(df: pd.DataFrame) -> list[Game]:
+    return records_from_frame(
+        Game,
+        df,
+        {
+            "location": "location_name",
+            "start_time": "start_ts",
+            "opposition_team": "opposition",
+        },
+    )
+
+
+def main() -> None:
+    for seasons in [1, 10]:
+        df = season_results(seasons)
+        assert with_iterrows(df) == with_records(df)
+        for name, build in [("iterrows", with_iterrows), ("records", with_records)]:
+            seconds = min(timeit.repeat(lambda: build(df), number=1, repeat=REPEAT))
+            print(f"{df.shape[0]:>6} rows {name:>9}: {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
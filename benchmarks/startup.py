@@ -0,0 +1,262 @@
+"""Profile the cold start of the app: what importing it costs, package by package,
+and how long each page in pages.py takes to first render in a fresh interpreter.
+
+Every page reads the database on its first render, so run it from the repository
+root against a reachable database loaded with a season, e.g. one loaded with
+`python -m database_scripts`, with the database environment variables set:
+
+    python benchmarks/startup.py [--check] [--top 15]
+
+--check exits 1 when the startup is over its budget. When the pages can't connect
+to the database their renders aren't timed, and it exits 2 instead, as that says
+nothing about the budget.
+"""
+
+import argparse
+import ast
+import json
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+APPS_PATH = Path(__file__).resolve().parents[1] / "apps"
+
+# The regression budget, in seconds.
+IMPORT_BUDGET = 2.0
+RENDER_BUDGET = 8.0
+# Heavy optional dependencies, and the only pages allowed to import them. Importing
+# the app itself must not import any of them.
+DEFERRED_MODULES = {
+    "altair": [
+        "registration/registration_overview.py",
+        "finance/club_fees_overview.py",
+    ],
+    "streamlit_calendar": [],
+    "requests": ["console/console.py"],
+}
+# The exceptions a page raises when it can't connect to the database.
+DATABASE_ERRORS = {"OperationalError"}
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass(slots=True)
+class ImportTime:
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+    depth: int
+
+
+@dataclass(slots=True)
+class PageRender:
+    page: str
+    seconds: float
+    render_seconds: float
+    deferred_modules: list[str]
+    exception: str
+    database_error: str
+
+
+def import_profile(module: str = "app") -> list[ImportTime]:
+    """Import the module in a fresh interpreter with `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APPS_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [
+        ImportTime(
+            module=match[4],
+            self_seconds=int(match[1]) / 1e6,
+            cumulative_seconds=int(match[2]) / 1e6,
+            depth=len(match[3]) // 2,
+        )
+        for match in IMPORT_TIME.finditer(result.stderr)
+    ]
+
+
+def import_seconds(imports: list[ImportTime], module: str = "app") -> float:
+    """The seconds importing the module took, including everything it imported."""
+    return next(
+        imported.cumulative_seconds
+        for imported in imports
+        if imported.module == module and imported.depth == 0
+    )
+
+
+def package_totals(imports: list[ImportTime]) -> dict[str, float]:
+    """The seconds spent importing each top level package, slowest first."""
+    totals: dict[str, float] = {}
+    for module in imports:
+        package = module.module.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + module.self_seconds
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def page_paths() -> list[str]:
+    """The script of each st.Page in pages.py.
+
+    Read from the source, st.Page can't be inspected outside of a running app.
+    """
+    tree = ast.parse((APPS_PATH / "pages.py").read_text())
+    directories = {}
+    paths = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Call):
+            continue
+        call = node.value
+        name = getattr(call.func, "attr", getattr(call.func, "id", None))
+        if name == "Path":
+            directories[node.targets[0].id] = call.args[0].value
+        elif name == "Page":
+            page = next(
+                keyword.value for keyword in call.keywords if keyword.arg == "page"
+            )
+            paths.append(f"{directories[page.left.id]}/{page.right.value}")
+    return paths
+
+
+def render_page(page: str) -> PageRender:
+    """Render the page for the first time, in a fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, __file__, "--render", page],
+        cwd=APPS_PATH,
+        capture_output=True,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode:
+        return PageRender(page, seconds, 0.0, [], result.stderr.strip()[-200:], "")
+    return PageRender(page, seconds, **json.loads(result.stdout.splitlines()[-1]))
+
+
+def over_budget(imports: list[ImportTime], renders: list[PageRender]) -> list[str]:
+    """Why the startup is over its budget, empty if it isn't."""
+    problems = []
+    seconds = import_seconds(imports)
+    if seconds > IMPORT_BUDGET:
+        problems.append(
+            f"importing the app took {seconds:.2f}s, the budget is {IMPORT_BUDGET}s"
+        )
+    imported = {module.module for module in imports}
+    problems += [
+        f"importing the app imports {module}"
+        for module in DEFERRED_MODULES
+        if module in imported
+    ]
+    for render in renders:
+        if render.database_error:
+            # Not timed, reported apart from the budget.
+            continue
+        if render.exception:
+            problems.append(f"{render.page} raised {render.exception}")
+        if render.seconds > RENDER_BUDGET:
+            problems.append(
+                f"{render.page} took {render.seconds:.2f}s to first render, "
+                f"the budget is {RENDER_BUDGET}s"
+            )
+        problems += [
+            f"{render.page} imports {module}"
+            for module in render.deferred_modules
+            if render.page not in DEFERRED_MODULES[module]
+        ]
+    return problems
+
+
+def _render(page: str) -> None:
+    """Run in the subprocess started by render_page, prints the result as json."""
+    sys.path.insert(0, str(APPS_PATH))
+    from streamlit.testing.v1 import AppTest
+
+    # The page paths in pages.py are relative to app.py, import it as app.py would,
+    # rather than from inside the page.
+    import pages  # noqa: F401
+
+    before = set(sys.modules)
+    at = AppTest.from_file(page, default_timeout=60)
+    # Render the page itself as a logged in user, rather than the login links.
+    at.session_state["authentication_status"] = True
+    at.session_state["username"] = "startup@profile"
+    start = time.perf_counter()
+    at.run()
+    render_seconds = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "render_seconds": render_seconds,
+                "deferred_modules": [
+                    module
+                    for module in DEFERRED_MODULES
+                    if module in sys.modules and module not in before
+                ],
+                "exception": "; ".join(
+                    error.message
+                    for error in at.exception
+                    if error.proto.type not in DATABASE_ERRORS
+                ),
+                "database_error": "; ".join(
+                    error.message
+                    for error in at.exception
+                    if error.proto.type in DATABASE_ERRORS
+                ),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Check the budget.")
+    parser.add_argument("--top", type=int, default=15, help="Packages to show.")
+    parser.add_argument("--render", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.render:
+        return _render(args.render)
+
+    imports = import_profile()
+    print(f"import app: {import_seconds(imports):.2f}s")
+    for package, seconds in list(package_totals(imports).items())[: args.top]:
+        print(f"    {package:<28} {seconds * 1000:8.1f} ms")
+    renders = []
+    for page in page_paths():
+        renders.append(render_page(page))
+        if renders[-1].database_error:
+            # The other pages can't connect either, and may each wait to time out.
+            break
+    print("first render, cold:")
+    for render in renders:
+        if render.database_error:
+            print(f"    {render.page:<40} couldn't connect to the database")
+            continue
+        print(
+            f"    {render.page:<40} {render.seconds:6.2f}s"
+            f" (run {render.render_seconds:.2f}s)"
+            + (
+                f" imports {', '.join(render.deferred_modules)}"
+                if render.deferred_modules
+                else ""
+            )
+        )
+    if not args.check:
+        return
+    problems = over_budget(imports, renders)
+    for problem in problems:
+        print(f"over budget: {problem}", file=sys.stderr)
+    unreachable = next((render for render in renders if render.database_error), None)
+    if unreachable:
+        print(
+            f"not checked: {unreachable.page} couldn't connect to the database, "
+            f"{unreachable.database_error.splitlines()[0]}",
+            file=sys.stderr,
+        )
+    sys.exit(1 if problems else 2 if unreachable else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,104 @@
+import logging
+import os
+from typing import Optional
 from sqlalchemy.orm import Session
 
 from common.config import config
 from db import engine
+from .loader import LoadFromCSV
+from .manifest import MANIFEST_FILENAME, Manifest
 from .locations import Locations
 from .teams import Teams
 from .games import Games
 from .selections import Selections
+from .scheduler import run_in_dependency_order
+from .migrations import apply_migrations
+from .schema import apply_schema
 
 LOCATIONS_SOURCE_DATA_FILENAME = "locations.csv"
 TEAMS_SOURCE_DATA_FILENAME = "teams.csv"
 GAMES_SOURCE_DATA_FILENAME = "games.csv"
 SELECTIONS_SOURCE_DATA_FILENAME = "selections.csv"
 SOURCE_LOCATION = lambda x: f"data/{config.year}/{x}"
+# Set to stream each csv into its table this many rows at a time.
+CHUNKSIZE = int(os.getenv("LOAD_CHUNKSIZE", default=0)) or None
+# Set to skip unchanged files and rows, by their hashes from the last run.
+INCREMENTAL = os.getenv("LOAD_INCREMENTAL", default="").lower() in ("1", "true")
+# Tables loaded at the same time, each on its own pooled connection.
+MAX_WORKERS = int(os.getenv("LOAD_MAX_WORKERS", default=2))
 
-session = Session(engine)
+SOURCES: dict[type[LoadFromCSV], str] = {
+    Locations: LOCATIONS_SOURCE_DATA_FILENAME,
+    Teams: TEAMS_SOURCE_DATA_FILENAME,
+    Games: GAMES_SOURCE_DATA_FILENAME,
+    Selections: SELECTIONS_SOURCE_DATA_FILENAME,
+}
 
-location = Locations(session, SOURCE_LOCATION(LOCATIONS_SOURCE_DATA_FILENAME))
-team = Teams(session, SOURCE_LOCATION(TEAMS_SOURCE_DATA_FILENAME))
-game = Games(session, SOURCE_LOCATION(GAMES_SOURCE_DATA_FILENAME))
-selection = Selections(session, SOURCE_LOCATION(SELECTIONS_SOURCE_DATA_FILENAME))
+
+def run_all_sources(*actions: str) -> dict[str, float]:
+    """
+    Run the actions, e.g. "load" then "update", on every source. A table starts once
+    the tables its foreign keys reference are done.
+    Returns: The seconds each table took.
+    """
+    manifest = Manifest(SOURCE_LOCATION(MANIFEST_FILENAME)) if INCREMENTAL else None
+    timings = run_in_dependency_order(
+        {
+            loader.SPEC.table: _task(loader, filename, actions, manifest)
+            for loader, filename in SOURCES.items()
+        },
+        {loader.SPEC.table: loader.SPEC.depends_on for loader in SOURCES},
+        max_workers=MAX_WORKERS,
+    )
+    if manifest is not None:
+        manifest.save()
+    return timings
 
 
 def load_all_sources():
-    location.load()
-    team.load()
-    game.load()
-    selection.load()
+    return run_all_sources("load")
 
 
 def update_all_sources():
-    location.update()
-    team.update()
-    game.update()
-    selection.update()
+    return run_all_sources("update")
+
+
+def _task(
+    loader: type[LoadFromCSV],
+    filename: str,
+    actions: tuple[str, ...],
+    manifest: Optional[Manifest] = None,
+):
+    filename = SOURCE_LOCATION(filename)
+
+    def run():
+        if manifest is None:
+            with Session(engine) as session:
+                source = loader(session, filename, CHUNKSIZE)
+                for action in actions:
+                    getattr(source, action)()
+            return
+        for action in actions:
+            if manifest.unchanged(filename, action):
+                logging.info(f"{filename} unchanged since the last {action}, skipping")
+                continue
+            with Session(engine) as session:
+                source = loader(
+                    session,
+                    filename,
+                    previous_row_hashes=manifest.row_hashes(filename, action),
+                )
+                getattr(source, action)()
+            manifest.record(filename, action, source.row_hashes.to_dict())
+
+    return run
 
 
 if __name__ == "__main__":
-    load_all_sources()
-    update_all_sources()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s"
+    )
+    with Session(engine) as session:
+        apply_migrations(session)
+        apply_schema(session)
+    run_all_sources("load", "update")
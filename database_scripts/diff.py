@@ -0,0 +1,115 @@
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import pandas as pd
+
+from .utils import add_timestamp
+
+CHANGE_COLUMNS = ["id", "column", "current_value", "new_value"]
+
+
+def find_changes(
+    session: Session, table: str, source: pd.DataFrame, columns: list[str]
+) -> pd.DataFrame:
+    """
+    Compare the source rows to the rows already in the table, fetching the current
+    state of the table in one query.
+    Empty source values are not treated as changes.
+
+    Returns: One row per changed cell, with the columns id, column, current_value and new_value.
+    """
+    ids = source["id"].astype(str).unique().tolist()
+    current = pd.read_sql_query(
+        text(f"SELECT id, {', '.join(columns)} FROM {table} WHERE id = any(:ids)"),
+        session.connection(),
+        params={"ids": ids},
+    )
+    if not current.shape[0]:
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    merged = (
+        source.drop_duplicates(subset=["id"], keep="last")
+        .astype({"id": str})
+        .merge(current, on="id", suffixes=("", "_current"))
+    )
+    changes = []
+    for column in columns:
+        new_values = merged[column]
+        current_values = merged[f"{column}_current"]
+        changed = ~_equal(current_values, new_values) & ~_is_empty(new_values)
+        changes.append(
+            pd.DataFrame(
+                {
+                    "id": merged.loc[changed, "id"],
+                    "column": column,
+                    "current_value": current_values[changed],
+                    "new_value": new_values[changed],
+                }
+            )
+        )
+    return pd.concat(changes, ignore_index=True)[CHANGE_COLUMNS]
+
+
+def apply_changes(session: Session, table: str, changes: pd.DataFrame) -> None:
+    """
+    Write the changed cells, one batched UPDATE per column, in one transaction.
+    """
+    update_ts = add_timestamp()
+    for column, column_changes in changes.groupby("column"):
+        logging.info(f"Updating {column_changes.shape[0]} rows of {table}.{column}")
+        session.execute(
+            text(
+                f"""
+                UPDATE {table}
+                SET {column} = :value, update_ts = :update_ts
+                WHERE id = :id
+                """
+            ),
+            [
+                {"id": id, "value": value, "update_ts": update_ts}
+                for id, value in zip(
+                    column_changes["id"], column_changes["new_value"].astype(object)
+                )
+            ],
+        )
+    session.commit()
+
+
+def report_changes(table: str, changes: pd.DataFrame) -> None:
+    """
+    Log the changes that would be made to the table.
+    """
+    if not changes.shape[0]:
+        logging.info(f"No changes to {table}")
+        return
+    logging.info(
+        f"{changes.shape[0]} changes to {changes['id'].nunique()} rows of {table}:\n"
+        + changes.to_string(index=False)
+    )
+
+
+def _equal(current: pd.Series, new: pd.Series) -> pd.Series:
+    """Compare the values of the table and source, as the type of the table column."""
+    if pd.api.types.is_datetime64_any_dtype(current):
+        current = _naive(current)
+        new = _naive(pd.to_datetime(new, errors="coerce", format="mixed"))
+        return (current == new) | (current.isna() & new.isna())
+    if pd.api.types.is_numeric_dtype(current) or pd.api.types.is_bool_dtype(current):
+        current = pd.to_numeric(current, errors="coerce")
+        new = pd.to_numeric(_as_number(new), errors="coerce")
+        return (current == new) | (current.isna() & new.isna())
+    return current.astype(str) == new.astype(str)
+
+
+def _naive(values: pd.Series) -> pd.Series:
+    if getattr(values.dt, "tz", None) is not None:
+        return values.dt.tz_localize(None)
+    return values
+
+
+def _as_number(values: pd.Series) -> pd.Series:
+    """Booleans in the source csv are written as True/False."""
+    return values.replace({"True": 1, "False": 0, "true": 1, "false": 0})
+
+
+def _is_empty(values: pd.Series) -> pd.Series:
+    return values.isna() | (values.astype(str) == "")
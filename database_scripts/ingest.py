@@ -0,0 +1,46 @@
+import io
+import logging
+from sqlalchemy.orm import Session
+import pandas as pd
+
+
+def copy_merge(
+    session: Session, table: str, columns: list[str], df: pd.DataFrame
+) -> int:
+    """
+    Load the rows with COPY FROM STDIN into a staging table, then merge the rows
+    not already in the table with one INSERT ... ON CONFLICT statement.
+
+    Returns: The number of rows inserted.
+    """
+    staging_table = f"_staging_{table}"
+    column_list = ", ".join(columns)
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging_table}
+            (LIKE {table} INCLUDING DEFAULTS)
+            ON COMMIT DELETE ROWS
+            """
+        )
+        cursor.copy_expert(
+            f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {staging_table}
+            ON CONFLICT (id) DO NOTHING
+            """
+        )
+        inserted = cursor.rowcount
+    finally:
+        cursor.close()
+    session.commit()
+    logging.info(f"Loaded {inserted} of {df.shape[0]} rows into {table}")
+    return inserted
@@ -0,0 +1,195 @@
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import pandas as pd
+
+from .diff import apply_changes, find_changes, report_changes
+from .ingest import copy_merge
+from .manifest import hash_rows
+from .utils import add_timestamp, notify_table_changed
+
+DB_COLUMNS = ["id", "create_ts", "update_ts"]
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    How a source csv maps onto a table.
+
+    table: The table loaded into.
+    required_columns: Columns that must be set, loaded with new rows.
+    additional_columns: Columns that may be empty, only set by updates.
+    primary_key: Builds the id of each row, when the source has no id column.
+    derived_columns: Columns built from the source columns, e.g. foreign keys.
+    timestamp_columns: Columns parsed as datetimes.
+    fill_nulls_first: Fill nulls with "" before building the id, so a missing key
+        part is "" rather than "nan", as the ids already loaded were built.
+    depends_on: Tables the foreign keys reference, loaded first.
+    """
+
+    table: str
+    required_columns: list[str]
+    additional_columns: list[str] = field(default_factory=list)
+    primary_key: Optional[Callable[[pd.DataFrame], pd.Series]] = None
+    derived_columns: dict[str, Callable[[pd.DataFrame], pd.Series]] = field(
+        default_factory=dict
+    )
+    timestamp_columns: list[str] = field(default_factory=list)
+    fill_nulls_first: bool = False
+    depends_on: list[str] = field(default_factory=list)
+
+    @property
+    def source_columns(self) -> list[str]:
+        return self.required_columns + self.additional_columns
+
+    @property
+    def load_columns(self) -> list[str]:
+        return DB_COLUMNS + self.required_columns
+
+
+class LoadFromCSV:
+    """
+    Loads a source csv into the table described by SPEC.
+    Subclasses only declare the SPEC.
+    """
+
+    SPEC: TableSpec
+
+    def __init__(
+        self,
+        session: Session,
+        source_data_filename: str,
+        chunksize: Optional[int] = None,
+        previous_row_hashes: Optional[dict[str, str]] = None,
+    ):
+        """
+        chunksize: Stream the source csv into the table this many rows at a time,
+            instead of reading the whole file up front.
+        previous_row_hashes: The row hashes of the last load, only rows whose hash
+            has changed are loaded and updated. Not used when streaming.
+        """
+        self.session = session
+        self.source_data_filename = source_data_filename
+        self.chunksize = chunksize
+        self.previous_row_hashes = previous_row_hashes
+        if not chunksize:
+            self.validate()
+
+    @property
+    def table(self) -> str:
+        return self.SPEC.table
+
+    @cached_property
+    def source(self) -> pd.DataFrame:
+        return self._read_data()
+
+    @cached_property
+    def row_hashes(self) -> pd.Series:
+        return hash_rows(self.source, ["id"] + self.SPEC.source_columns)
+
+    @cached_property
+    def df(self) -> pd.DataFrame:
+        """The source rows to load and update."""
+        if not self.previous_row_hashes:
+            return self.source
+        previous = self.row_hashes.index.map(self.previous_row_hashes)
+        changed = previous != self.row_hashes.values
+        logging.info(
+            f"{changed.sum()} of {self.source.shape[0]} rows changed since the last load"
+        )
+        return self.source[changed]
+
+    def validate(self, df: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Checks:
+            - All mandatory columns present.
+            - No Nulls for mandatory columns.
+        Returns: True if validations successful, False if failed.
+        """
+        df = self.df if df is None else df
+        missing_columns = set(self.SPEC.required_columns) - set(df.columns)
+        if missing_columns:
+            logging.warning(
+                f"The following columns are missing: {', '.join(sorted(missing_columns))}"
+            )
+            return False
+        df = df[self.SPEC.required_columns]
+        res = (df.isna() | (df.astype(str) == "")).sum() > 0
+        if res.values.sum():
+            logging.warning(
+                f"The following columns have missing values: {', '.join((res[res==True].index))}"
+            )
+            return False
+        else:
+            logging.info("Source data validation completed succesfully")
+            return True
+
+    def load(self) -> int:
+        """
+        Insert the source rows not already in the table.
+        Returns: The number of rows inserted.
+        """
+        if self.chunksize:
+            return self._stream_load()
+        logging.info("Loading new records")
+        inserted = copy_merge(self.session, self.table, self.SPEC.load_columns, self.df)
+        if inserted:
+            notify_table_changed(self.session, self.table)
+        return inserted
+
+    def update(self, dry_run: bool = False) -> pd.DataFrame:
+        """
+        Update the rows already in the table that have changed in the source data.
+        dry_run: Report the changes without writing them.
+        Returns: The changed cells.
+        """
+        logging.info("Updating records")
+        changes = find_changes(
+            self.session, self.table, self.df, self.SPEC.source_columns
+        )
+        report_changes(self.table, changes)
+        if dry_run or not changes.shape[0]:
+            return changes
+        apply_changes(self.session, self.table, changes)
+        notify_table_changed(self.session, self.table)
+        return changes
+
+    def purge(self):
+        self.session.execute(text(f"DELETE FROM {self.table}"))
+        self.session.commit()
+        notify_table_changed(self.session, self.table)
+
+    def _stream_load(self) -> int:
+        logging.info(f"Streaming new records, {self.chunksize} rows at a time")
+        inserted = 0
+        for chunk in pd.read_csv(self.source_data_filename, chunksize=self.chunksize):
+            chunk = self._transform(chunk)
+            self.validate(chunk)
+            inserted += copy_merge(
+                self.session, self.table, self.SPEC.load_columns, chunk
+            )
+        if inserted:
+            notify_table_changed(self.session, self.table)
+        return inserted
+
+    def _read_data(self) -> pd.DataFrame:
+        logging.info(f"Reading in data from {self.source_data_filename}")
+        return self._transform(pd.read_csv(self.source_data_filename))
+
+    def _transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.SPEC.fill_nulls_first:
+            df = df.fillna("")
+        if self.SPEC.primary_key is not None:
+            df.loc[:, "id"] = self.SPEC.primary_key(df)
+        for column, derive in self.SPEC.derived_columns.items():
+            df.loc[:, column] = derive(df)
+        for column in self.SPEC.timestamp_columns:
+            df.loc[:, column] = pd.to_datetime(df[column], format="mixed").dt.strftime(
+                "%Y-%m-%dT%H:%M:%S.%f%z"
+            )
+        df.loc[:, "create_ts"] = add_timestamp()
+        df.loc[:, "update_ts"] = add_timestamp()
+        return df.fillna("")
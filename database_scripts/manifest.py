@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import pandas as pd
+
+# Kept next to the source csvs, records what the last successful run loaded.
+MANIFEST_FILENAME = ".load_manifest.json"
+
+
+def hash_file(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_rows(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    """
+    Returns: The content hash of each row, indexed by id.
+    """
+    hashes = pd.util.hash_pandas_object(df[columns].map(_canonical), index=False)
+    return pd.Series(hashes.astype(str).values, index=df["id"].astype(str).values)
+
+
+def _canonical(value) -> str:
+    """Integers read as floats, when the column has empty values, hash as integers."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Manifest:
+    """
+    The file and row content hashes of the source csvs from the last successful run
+    of each action. Each action, e.g. "load" or "update", is recorded separately, so
+    a file one action has seen is still new to the other.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._files = json.load(f)
+
+    def unchanged(self, filename: str, action: str) -> bool:
+        """
+        Returns: True if the file has the same content as when the action last
+            recorded it.
+        """
+        entry = self._files.get(_key(filename, action))
+        if entry is None:
+            return False
+        if entry["mtime"] == os.stat(filename).st_mtime:
+            return True
+        return entry["sha256"] == hash_file(filename)
+
+    def row_hashes(self, filename: str, action: str) -> dict[str, str]:
+        return self._files.get(_key(filename, action), {}).get("rows", {})
+
+    def record(self, filename: str, action: str, row_hashes: dict[str, str]):
+        entry = {
+            "mtime": os.stat(filename).st_mtime,
+            "sha256": hash_file(filename),
+            "rows": row_hashes,
+        }
+        with self._lock:
+            self._files[_key(filename, action)] = entry
+
+    def save(self):
+        with self._lock:
+            files = dict(self._files)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(files, f)
+        os.replace(temporary_path, self.path)
+        logging.info(f"Saved the load manifest to {self.path}")
+
+
+def _key(filename: str, action: str) -> str:
+    return f"{action}:{filename}"
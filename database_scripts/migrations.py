@@ -0,0 +1,285 @@
+import argparse
+import importlib
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .schema import apply_schema
+
+APPS_PATH = Path(__file__).resolve().parents[1] / "apps"
+# The invoice statuses the finance pages treat as settled.
+SETTLED_INVOICE_STATUSES = "('PAID', 'VOID', 'VOIDED', 'DELETED')"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    A versioned set of DDL statements, applied once and in version order.
+
+    version: Increases by one with each migration, never reused.
+    name: What the migration does.
+    statements: Run in one transaction, with the version recorded.
+    """
+
+    version: int
+    name: str
+    statements: list[str]
+
+
+MIGRATIONS = [
+    Migration(
+        version=1,
+        name="hot_path_indexes",
+        statements=[
+            "CREATE INDEX IF NOT EXISTS games_season_start_ts_idx ON games (season, start_ts)",
+            "CREATE INDEX IF NOT EXISTS games_season_round_idx ON games (season, round)",
+            "CREATE INDEX IF NOT EXISTS games_team_id_idx ON games (team_id)",
+            "CREATE INDEX IF NOT EXISTS selections_game_id_idx ON selections (game_id)",
+            "CREATE INDEX IF NOT EXISTS selections_player_id_idx ON selections (player_id)",
+            """
+            CREATE INDEX IF NOT EXISTS registrations_season_player_id_idx
+            ON registrations (season, player_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS registrations_player_id_idx
+            ON registrations (player_id)
+            """,
+            "CREATE INDEX IF NOT EXISTS invoices_player_id_idx ON invoices (player_id)",
+            """
+            CREATE INDEX IF NOT EXISTS invoices_registration_id_idx
+            ON invoices (registration_id)
+            """,
+            # Only the outstanding invoices are ever filtered on, by due date.
+            f"""
+            CREATE INDEX IF NOT EXISTS invoices_outstanding_due_date_idx
+            ON invoices (due_date)
+            WHERE
+                status NOT IN {SETTLED_INVOICE_STATUSES}
+                AND on_payment_plan = false
+            """,
+            f"""
+            CREATE INDEX IF NOT EXISTS invoices_outstanding_player_id_idx
+            ON invoices (player_id)
+            WHERE
+                status NOT IN {SETTLED_INVOICE_STATUSES}
+                AND on_payment_plan = false
+            """,
+        ],
+    ),
+    Migration(
+        version=2,
+        name="teams_team_name",
+        statements=[
+            # The "<team> - <grade>" name the pages show and filter on.
+            """
+            ALTER TABLE teams
+            ADD COLUMN IF NOT EXISTS team_name text
+            GENERATED ALWAYS AS (team || ' - ' || grade) STORED
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS teams_season_team_name_idx
+            ON teams (season, team_name)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS teams_season_team_order_idx
+            ON teams (season, team_order)
+            """,
+        ],
+    ),
+]
+
+# The indexes each model query is expected to use, at least one of them, checked
+# with EXPLAIN.
+EXPECTED_INDEXES = {
+    "selection.latest_round": ["games_season_start_ts_idx"],
+    "selection.week_games": ["games_season_start_ts_idx"],
+    "selection.week_selected_players": ["games_season_start_ts_idx"],
+    "selection.player_data": ["games_season_round_idx", "teams_season_team_name_idx"],
+    "selection.selections_input_data": [
+        "games_season_round_idx",
+        "teams_season_team_name_idx",
+    ],
+    "selection.game_data": ["games_season_start_ts_idx", "games_season_round_idx"],
+    "result.game_results_data": [
+        "games_season_start_ts_idx",
+        "games_season_round_idx",
+    ],
+    "result.game_results_page": [
+        "games_season_start_ts_idx",
+        "games_season_round_idx",
+    ],
+    "result.team_names": ["teams_season_team_order_idx"],
+    "result.team_results_data": ["season_standings_season_idx"],
+    "result.player_names": [
+        "registrations_season_player_id_idx",
+        "registrations_player_id_idx",
+    ],
+    "result.player_data": [
+        "selections_player_id_idx",
+        "registrations_season_player_id_idx",
+        "registrations_player_id_idx",
+    ],
+    # The primary key of the rollup starts with the season.
+    "result.leaderboard_data": ["player_season_stats_pkey"],
+    "registration.player_data": [
+        "registrations_season_player_id_idx",
+        "registrations_player_id_idx",
+    ],
+    "registration.team_data": ["teams_season_team_order_idx"],
+    "finance.invoice_data": [
+        "invoices_outstanding_due_date_idx",
+        "invoices_outstanding_player_id_idx",
+    ],
+    "finance.largest_over_due_debitors": ["invoices_outstanding_player_id_idx"],
+    # Reads every invoice, so only the joins can use an index.
+    "finance.invoice_overview_data": [
+        "invoices_player_id_idx",
+        "invoices_registration_id_idx",
+    ],
+    "finance.collected_fees_data": [
+        "registrations_season_player_id_idx",
+        "invoices_registration_id_idx",
+    ],
+}
+# Parameters bound to the model queries when explaining them.
+EXPLAIN_PARAMS = {
+    "season": "2024",
+    "player_id": "player",
+    "team": "West - PL",
+    "team_round": "1",
+    "game_round": None,
+    "date_start": "2024-04-01 00:00:00",
+    "date_end": "2024-04-08 00:00:00",
+}
+
+
+def apply_migrations(session: Session) -> list[int]:
+    """
+    Apply the migrations not yet recorded in schema_migrations, in version order.
+    Concurrent runs wait on an advisory lock, so each migration is applied once.
+    Returns: The versions applied.
+    """
+    session.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version integer PRIMARY KEY,
+                name text NOT NULL,
+                applied_ts timestamp NOT NULL DEFAULT now()
+            )
+            """
+        )
+    )
+    session.commit()
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda migration: migration.version):
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))")
+        )
+        done = session.execute(
+            text("SELECT 1 FROM schema_migrations WHERE version = :version"),
+            {"version": migration.version},
+        ).first()
+        if done:
+            session.commit()
+            continue
+        logging.info(f"Applying migration {migration.version}: {migration.name}")
+        for statement in migration.statements:
+            session.execute(text(statement))
+        session.execute(
+            text(
+                "INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"
+            ),
+            {"version": migration.version, "name": migration.name},
+        )
+        session.commit()
+        applied.append(migration.version)
+    if not applied:
+        logging.info("The schema is up to date")
+    return applied
+
+
+def check_query_plans(session: Session) -> dict[str, str]:
+    """
+    EXPLAIN each model query in EXPECTED_INDEXES, with sequential scans disabled so
+    the plan doesn't depend on how many rows the tables have. A query passes when
+    it uses one of its expected indexes, and still reads no table with a sequential
+    scan, i.e. every table it reads has an index it can use.
+    Returns: Why each failing query failed, empty if all passed.
+    """
+    queries = _model_queries()
+    failures = {}
+    for name, expected in EXPECTED_INDEXES.items():
+        query = queries[name]
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = session.execute(
+            text(f"EXPLAIN (FORMAT JSON) {query.sql}"),
+            {
+                param: EXPLAIN_PARAMS.get(param)
+                for param in text(query.sql).compile().params
+            },
+        ).scalar_one()
+        session.rollback()
+        nodes = _plan_nodes(plan if isinstance(plan, list) else json.loads(plan))
+        used = {node["Index Name"] for node in nodes if "Index Name" in node}
+        sequential = sorted(
+            {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+        )
+        if sequential:
+            failures[name] = f"sequential scan of {', '.join(sequential)}"
+        elif not used.intersection(expected):
+            failures[name] = f"uses none of {', '.join(expected)}"
+        if name in failures:
+            logging.warning(f"{name} fails the check, {failures[name]}")
+        else:
+            logging.info(f"{name} uses {', '.join(sorted(used))}")
+    return failures
+
+
+def _model_queries() -> dict[str, Any]:
+    """Import the apps' models, registering their queries."""
+    if str(APPS_PATH) not in sys.path:
+        sys.path.insert(0, str(APPS_PATH))
+    for module in {name.split(".")[0] for name in EXPECTED_INDEXES}:
+        importlib.import_module(f"{module}.models")
+    return importlib.import_module("queries").QUERIES
+
+
+def _plan_nodes(plan: Any) -> list[dict[str, Any]]:
+    """Every node of the EXPLAIN plan, flattened."""
+    if isinstance(plan, list):
+        return [node for item in plan for node in _plan_nodes(item)]
+    if not isinstance(plan, dict):
+        return []
+    nodes = [plan] if "Node Type" in plan else []
+    for value in plan.values():
+        if isinstance(value, (list, dict)):
+            nodes += _plan_nodes(value)
+    return nodes
+
+
+if __name__ == "__main__":
+    from db import engine
+
+    parser = argparse.ArgumentParser(
+        description="Apply the schema migrations, and the schema of the derived tables."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check the model queries use the indexes, after migrating.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    with Session(engine) as session:
+        apply_migrations(session)
+        # The apps read the derived tables, so they are created before deploying too,
+        # and backfilled in case a trigger changed how they are computed.
+        apply_schema(session, backfill=True)
+        if args.check and check_query_plans(session):
+            sys.exit(1)
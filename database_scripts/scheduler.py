@@ -0,0 +1,64 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+
+def run_in_dependency_order(
+    tasks: dict[str, Callable[[], None]],
+    dependencies: dict[str, list[str]],
+    max_workers: Optional[int] = None,
+) -> dict[str, float]:
+    """
+    Run the task of each table once the tasks of the tables it depends on have
+    finished, running independent tables concurrently.
+    Dependencies on tables without a task are treated as met.
+    Returns: The seconds each table's task took.
+    """
+    pending = dict(tasks)
+    done: set[str] = set()
+    failed: set[str] = set()
+    timings: dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: dict[Future, str] = {}
+        while pending or running:
+            for table in [t for t in pending if _ready(t, dependencies, tasks, done)]:
+                running[executor.submit(_timed, pending.pop(table))] = table
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = running.pop(future)
+                try:
+                    timings[table] = future.result()
+                except Exception:
+                    logging.exception(f"{table} failed")
+                    failed.add(table)
+                    continue
+                logging.info(f"Finished {table} in {timings[table]:.2f}s")
+                done.add(table)
+    if failed or pending:
+        raise RuntimeError(
+            f"Failed: {', '.join(sorted(failed)) or '-'}, "
+            f"not run: {', '.join(sorted(pending)) or '-'}"
+        )
+    return timings
+
+
+def _ready(
+    table: str,
+    dependencies: dict[str, list[str]],
+    tasks: dict[str, Callable[[], None]],
+    done: set[str],
+) -> bool:
+    return all(
+        dependency in done
+        for dependency in dependencies.get(table, [])
+        if dependency in tasks
+    )
+
+
+def _timed(task: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    task()
+    return time.perf_counter() - start
@@ -0,0 +1,450 @@
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Per team and season standings, refreshed by a trigger whenever a game changes.
+# A game counts once both its scores are set. The apps only read the standings.
+SEASON_STANDINGS = [
+    """
+    CREATE TABLE IF NOT EXISTS season_standings (
+        team_id text PRIMARY KEY,
+        season text NOT NULL,
+        games_played integer NOT NULL DEFAULT 0,
+        wins integer NOT NULL DEFAULT 0,
+        losses integer NOT NULL DEFAULT 0,
+        draws integer NOT NULL DEFAULT 0,
+        goals_for integer NOT NULL DEFAULT 0,
+        goals_against integer NOT NULL DEFAULT 0,
+        points integer NOT NULL DEFAULT 0,
+        update_ts timestamp NOT NULL DEFAULT now()
+    )
+    """,
+    "ALTER TABLE season_standings DROP COLUMN IF EXISTS valid_until",
+    """
+    CREATE INDEX IF NOT EXISTS season_standings_season_idx
+    ON season_standings (season)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION refresh_team_standings(_team_id text)
+    RETURNS void
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        DELETE FROM season_standings WHERE team_id = _team_id;
+        INSERT INTO season_standings (
+            team_id,
+            season,
+            games_played,
+            wins,
+            losses,
+            draws,
+            goals_for,
+            goals_against,
+            points,
+            update_ts
+        )
+        SELECT
+            _team_id,
+            max(season),
+            count(*) FILTER (WHERE played),
+            count(*) FILTER (WHERE played AND goals_for > goals_against),
+            count(*) FILTER (WHERE played AND goals_for < goals_against),
+            count(*) FILTER (WHERE played AND goals_for = goals_against),
+            coalesce(sum(goals_for) FILTER (WHERE played), 0),
+            coalesce(sum(goals_against) FILTER (WHERE played), 0),
+            2 * count(*) FILTER (WHERE played AND goals_for > goals_against)
+                + count(*) FILTER (WHERE played AND goals_for = goals_against),
+            now()
+        FROM (
+            SELECT
+                season,
+                goals_for,
+                goals_against,
+                goals_for IS NOT NULL AND goals_against IS NOT NULL AS played
+            FROM (
+                SELECT
+                    season,
+                    nullif(goals_for::text, '')::numeric::integer AS goals_for,
+                    nullif(goals_against::text, '')::numeric::integer AS goals_against
+                FROM games
+                WHERE team_id = _team_id
+            ) AS scores
+        ) AS team_games
+        HAVING count(*) > 0;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION refresh_season_standings(_season text)
+    RETURNS void
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        PERFORM refresh_team_standings(team_id)
+        FROM (SELECT DISTINCT team_id FROM games WHERE season = _season) AS teams;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION games_refresh_standings()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM refresh_team_standings(OLD.team_id);
+        END IF;
+        IF TG_OP = 'INSERT'
+            OR (TG_OP = 'UPDATE' AND NEW.team_id IS DISTINCT FROM OLD.team_id)
+        THEN
+            PERFORM refresh_team_standings(NEW.team_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS games_refresh_standings ON games",
+    """
+    CREATE TRIGGER games_refresh_standings
+    AFTER INSERT OR DELETE OR UPDATE OF team_id, season, goals_for, goals_against
+    ON games
+    FOR EACH ROW EXECUTE FUNCTION games_refresh_standings()
+    """,
+]
+# Backfill, and catch up on games written before the trigger existed.
+SEASON_STANDINGS_BACKFILL = [
+    """
+    SELECT refresh_season_standings(season)
+    FROM (SELECT DISTINCT season FROM games) AS seasons
+    """,
+]
+
+
+def _statement_triggers(table: str, function: str, events: list[str]) -> list[str]:
+    """
+    One statement level trigger per event, as a trigger with a transition table can
+    only have one event. The function reads the rows written from new_rows and
+    old_rows, once per statement rather than once per row.
+    """
+    transition_tables = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    statements = []
+    for event in events:
+        trigger = f"{function}_{event.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {trigger} ON {table}",
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER {event} ON {table}
+            REFERENCING {transition_tables[event]}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """,
+        ]
+    return statements
+
+
+# Per player, season and team totals of the games the player played, refreshed by
+# triggers on results, selections and games. Each statement refreshes the players
+# and seasons it changed once, however many rows it wrote.
+PLAYER_SEASON_STATS = [
+    """
+    CREATE TABLE IF NOT EXISTS player_season_stats (
+        player_id text NOT NULL,
+        season text NOT NULL,
+        team_id text NOT NULL,
+        games_played integer NOT NULL DEFAULT 0,
+        games_won integer NOT NULL DEFAULT 0,
+        goals integer NOT NULL DEFAULT 0,
+        green_cards integer NOT NULL DEFAULT 0,
+        yellow_cards integer NOT NULL DEFAULT 0,
+        red_cards integer NOT NULL DEFAULT 0,
+        update_ts timestamp NOT NULL DEFAULT now(),
+        PRIMARY KEY (season, player_id, team_id)
+    )
+    """,
+    # The row level triggers, and the per player function they called.
+    "DROP TRIGGER IF EXISTS results_refresh_player_stats ON results",
+    "DROP TRIGGER IF EXISTS selections_refresh_player_stats ON selections",
+    "DROP TRIGGER IF EXISTS games_refresh_player_stats ON games",
+    "DROP FUNCTION IF EXISTS refresh_player_stats(text, text)",
+    # Only the rows whose totals differ are written.
+    """
+    CREATE OR REPLACE FUNCTION refresh_player_stats(
+        _player_ids text[],
+        _seasons text[]
+    )
+    RETURNS void
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        DELETE FROM player_season_stats AS ps
+        USING unnest(_player_ids, _seasons) AS changed (player_id, season)
+        WHERE
+            ps.player_id = changed.player_id AND
+            ps.season = changed.season AND
+            NOT EXISTS (
+                SELECT 1
+                FROM selections AS s
+                INNER JOIN games AS g
+                ON s.game_id = g.id
+                WHERE
+                    s.played = true AND
+                    s.player_id = ps.player_id AND
+                    g.season = ps.season AND
+                    g.team_id = ps.team_id
+            );
+        INSERT INTO player_season_stats (
+            player_id,
+            season,
+            team_id,
+            games_played,
+            games_won,
+            goals,
+            green_cards,
+            yellow_cards,
+            red_cards,
+            update_ts
+        )
+        SELECT
+            s.player_id,
+            g.season,
+            g.team_id,
+            count(*),
+            count(*) FILTER (
+                WHERE nullif(g.goals_for::text, '')::numeric
+                    > nullif(g.goals_against::text, '')::numeric
+            ),
+            coalesce(sum(re.goals), 0),
+            coalesce(sum(re.green_card), 0),
+            coalesce(sum(re.yellow_card), 0),
+            coalesce(sum(re.red_card), 0),
+            now()
+        FROM selections AS s
+        INNER JOIN games AS g
+        ON s.game_id = g.id
+        INNER JOIN (
+            SELECT DISTINCT player_id, season
+            FROM unnest(_player_ids, _seasons) AS changed (player_id, season)
+        ) AS changed
+        ON
+            s.player_id = changed.player_id AND
+            g.season = changed.season
+        LEFT JOIN results AS re
+        ON s.id = re.id
+        WHERE
+            s.played = true
+        GROUP BY
+            s.player_id,
+            g.season,
+            g.team_id
+        ON CONFLICT (season, player_id, team_id) DO UPDATE
+        SET
+            games_played = excluded.games_played,
+            games_won = excluded.games_won,
+            goals = excluded.goals,
+            green_cards = excluded.green_cards,
+            yellow_cards = excluded.yellow_cards,
+            red_cards = excluded.red_cards,
+            update_ts = excluded.update_ts
+        WHERE
+            (
+                player_season_stats.games_played,
+                player_season_stats.games_won,
+                player_season_stats.goals,
+                player_season_stats.green_cards,
+                player_season_stats.yellow_cards,
+                player_season_stats.red_cards
+            ) IS DISTINCT FROM (
+                excluded.games_played,
+                excluded.games_won,
+                excluded.goals,
+                excluded.green_cards,
+                excluded.yellow_cards,
+                excluded.red_cards
+            );
+    END;
+    $$
+    """,
+    # The players of the results written, any column of an updated result.
+    """
+    CREATE OR REPLACE FUNCTION results_refresh_player_stats()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        _ids text[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(id) INTO _ids FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT array_agg(id) INTO _ids FROM old_rows;
+        ELSE
+            SELECT array_agg(id) INTO _ids
+            FROM (
+                (
+                    SELECT id, goals, green_card, yellow_card, red_card FROM old_rows
+                    EXCEPT
+                    SELECT id, goals, green_card, yellow_card, red_card FROM new_rows
+                )
+                UNION
+                (
+                    SELECT id, goals, green_card, yellow_card, red_card FROM new_rows
+                    EXCEPT
+                    SELECT id, goals, green_card, yellow_card, red_card FROM old_rows
+                )
+            ) AS changed;
+        END IF;
+        PERFORM refresh_player_stats(array_agg(player_id), array_agg(season))
+        FROM (
+            SELECT DISTINCT s.player_id, g.season
+            FROM selections AS s
+            INNER JOIN games AS g
+            ON s.game_id = g.id
+            WHERE s.id = ANY(_ids)
+        ) AS player_seasons
+        HAVING count(*) > 0;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    # The players of the played selections written.
+    """
+    CREATE OR REPLACE FUNCTION selections_refresh_player_stats()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        _game_ids text[];
+        _player_ids text[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(game_id), array_agg(player_id)
+            INTO _game_ids, _player_ids
+            FROM new_rows
+            WHERE played = true;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT array_agg(game_id), array_agg(player_id)
+            INTO _game_ids, _player_ids
+            FROM old_rows
+            WHERE played = true;
+        ELSE
+            SELECT array_agg(game_id), array_agg(player_id)
+            INTO _game_ids, _player_ids
+            FROM (
+                (
+                    SELECT id, game_id, player_id, played FROM old_rows
+                    EXCEPT
+                    SELECT id, game_id, player_id, played FROM new_rows
+                )
+                UNION
+                (
+                    SELECT id, game_id, player_id, played FROM new_rows
+                    EXCEPT
+                    SELECT id, game_id, player_id, played FROM old_rows
+                )
+            ) AS changed
+            WHERE played = true;
+        END IF;
+        PERFORM refresh_player_stats(array_agg(player_id), array_agg(season))
+        FROM (
+            SELECT DISTINCT changed.player_id, g.season
+            FROM unnest(_game_ids, _player_ids) AS changed (game_id, player_id)
+            INNER JOIN games AS g
+            ON changed.game_id = g.id
+        ) AS player_seasons
+        HAVING count(*) > 0;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    # The players of the games whose team, season or score were updated.
+    """
+    CREATE OR REPLACE FUNCTION games_refresh_player_stats()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        PERFORM refresh_player_stats(array_agg(player_id), array_agg(season))
+        FROM (
+            SELECT DISTINCT s.player_id, changed.season
+            FROM (
+                (
+                    SELECT id, team_id, season, goals_for, goals_against FROM old_rows
+                    EXCEPT
+                    SELECT id, team_id, season, goals_for, goals_against FROM new_rows
+                )
+                UNION
+                (
+                    SELECT id, team_id, season, goals_for, goals_against FROM new_rows
+                    EXCEPT
+                    SELECT id, team_id, season, goals_for, goals_against FROM old_rows
+                )
+            ) AS changed
+            INNER JOIN selections AS s
+            ON changed.id = s.game_id
+            WHERE s.played = true
+        ) AS player_seasons
+        HAVING count(*) > 0;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    *_statement_triggers(
+        "results", "results_refresh_player_stats", ["INSERT", "UPDATE", "DELETE"]
+    ),
+    *_statement_triggers(
+        "selections", "selections_refresh_player_stats", ["INSERT", "UPDATE", "DELETE"]
+    ),
+    *_statement_triggers("games", "games_refresh_player_stats", ["UPDATE"]),
+]
+# Backfill, and catch up on writes made before the triggers existed. Recomputes every
+# player's totals, only writing the rows that differ, so is run when migrating rather
+# than on every load.
+PLAYER_SEASON_STATS_BACKFILL = [
+    """
+    SELECT refresh_player_stats(array_agg(player_id), array_agg(season))
+    FROM (
+        SELECT s.player_id, g.season
+        FROM selections AS s
+        INNER JOIN games AS g
+        ON s.game_id = g.id
+        UNION
+        SELECT player_id, season
+        FROM player_season_stats
+    ) AS player_seasons
+    """,
+]
+SCHEMA = SEASON_STANDINGS + PLAYER_SEASON_STATS
+# The statements backfilling each derived table.
+BACKFILLS = {
+    "season_standings": SEASON_STANDINGS_BACKFILL,
+    "player_season_stats": PLAYER_SEASON_STATS_BACKFILL,
+}
+
+
+def apply_schema(session: Session, backfill: bool = False):
+    """
+    Create or replace the derived tables, and the functions and triggers keeping them
+    up to date. Safe to run on every load. A table is backfilled when it is created,
+    or every table when backfill is set, e.g. when migrating.
+    """
+    logging.info("Applying the schema for the derived tables")
+    backfills = [
+        table
+        for table in BACKFILLS
+        if backfill
+        or session.execute(
+            text("SELECT to_regclass(:table)"), {"table": table}
+        ).scalar_one()
+        is None
+    ]
+    for statement in SCHEMA:
+        session.execute(text(statement))
+    for table in backfills:
+        logging.info(f"Backfilling {table}")
+        for statement in BACKFILLS[table]:
+            session.execute(text(statement))
+    session.commit()
@@ -1,5 +1,19 @@
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# The Postgres channel table changes are published on, the app listens to it to refresh its cache.
+TABLE_CHANGED_CHANNEL = "table_changed"
 
 
 def add_timestamp() -> str:
     return datetime.now().isoformat()
+
+
+def notify_table_changed(session: Session, table: str) -> None:
+    """Publish a "table changed" event for the app to drop its cached queries on the table."""
+    session.execute(
+        text("select pg_notify(:channel, :table)"),
+        {"channel": TABLE_CHANGED_CHANNEL, "table": table},
+    )
+    session.commit()